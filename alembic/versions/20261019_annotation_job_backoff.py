@@ -0,0 +1,31 @@
+"""annotationjob: next_attempt_at for retry backoff
+
+Revision ID: 20261019_annotation_job_backoff
+Revises: 20261019_availability_ranges
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_annotation_job_backoff"
+down_revision = "20261019_availability_ranges"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "annotationjob",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("(now() AT TIME ZONE 'utc')"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("annotationjob", "next_attempt_at")
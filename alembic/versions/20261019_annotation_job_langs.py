@@ -0,0 +1,23 @@
+"""annotationjob: langs column for multi-language jobs
+
+Revision ID: 20261019_annotation_job_langs
+Revises: 20261019_annotation_jobs
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_annotation_job_langs"
+down_revision = "20261019_annotation_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("annotationjob", sa.Column("langs", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("annotationjob", "langs")
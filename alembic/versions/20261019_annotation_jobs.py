@@ -0,0 +1,54 @@
+"""annotationjob: queue for AI match comment generation
+
+Revision ID: 20261019_annotation_jobs
+Revises: 20261019_email_outbox
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_annotation_jobs"
+down_revision = "20261019_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "annotationjob",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("match_id", sa.Integer(), sa.ForeignKey("match.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("lang", sa.String(), nullable=False),
+        sa.Column("perspective", sa.String(), nullable=False),
+        sa.Column("requested_by", sa.Integer(), sa.ForeignKey("user.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_annotationjob_match_id", "annotationjob", ["match_id"])
+    # Coalescing: concurrent requests for the same comment share one live job
+    op.create_index(
+        "ux_annotationjob_active",
+        "annotationjob",
+        ["match_id", "lang", "perspective"],
+        unique=True,
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+    op.create_index(
+        "ix_annotationjob_queued",
+        "annotationjob",
+        ["id"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_annotationjob_queued", table_name="annotationjob")
+    op.drop_index("ux_annotationjob_active", table_name="annotationjob")
+    op.drop_index("ix_annotationjob_match_id", table_name="annotationjob")
+    op.drop_table("annotationjob")
@@ -0,0 +1,65 @@
+"""availabilityrange: per-user merged availability windows
+
+Revision ID: 20261019_availability_ranges
+Revises: 20261019_annotation_job_langs
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_availability_ranges"
+down_revision = "20261019_annotation_job_langs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        sa.text(
+            """
+            CREATE TABLE IF NOT EXISTS availabilityrange (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES "user"(id) ON DELETE CASCADE,
+                start_dt_utc TIMESTAMPTZ NOT NULL,
+                end_dt_utc TIMESTAMPTZ NOT NULL,
+                window_utc tstzrange
+                    GENERATED ALWAYS AS (tstzrange(start_dt_utc, end_dt_utc, '[)')) STORED
+            )
+            """
+        )
+    )
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_availabilityrange_user_id ON availabilityrange (user_id)"))
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS availabilityrange_window_gist ON availabilityrange USING gist(window_utc)"))
+
+    # Backfill from the slots; from here on the app rewrites a user's rows on every slot write
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO availabilityrange (user_id, start_dt_utc, end_dt_utc)
+            SELECT user_id, min(start_dt_utc), max(end_dt_utc)
+            FROM (
+                SELECT user_id, start_dt_utc, end_dt_utc,
+                       sum(starts_run::int) OVER (PARTITION BY user_id ORDER BY start_dt_utc, end_dt_utc) AS run
+                FROM (
+                    SELECT user_id, start_dt_utc, end_dt_utc,
+                           start_dt_utc > coalesce(
+                               max(end_dt_utc) OVER (
+                                   PARTITION BY user_id ORDER BY start_dt_utc, end_dt_utc
+                                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                               ),
+                               '-infinity'
+                           ) AS starts_run
+                    FROM availabilityslot
+                    WHERE end_dt_utc > start_dt_utc
+                ) s
+            ) r
+            GROUP BY user_id, run
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS availabilityrange"))
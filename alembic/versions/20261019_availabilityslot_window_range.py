@@ -0,0 +1,60 @@
+"""availabilityslot: generated tstzrange window, drop availability_once
+
+Revision ID: 20261019_availabilityslot_window_range
+Revises: 20251009_add_profile_notification_prefs
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_availabilityslot_window_range"
+down_revision = "20251009_add_profile_notification_prefs"
+branch_labels = None
+# start/end must already be timestamptz (generated columns need immutable expressions)
+depends_on = ("a250913_tz_availslot", "a20250913_availability_once")
+
+
+def upgrade() -> None:
+    # The slot row becomes the single source of truth for overlap queries
+    op.execute(
+        sa.text(
+            """
+            ALTER TABLE availabilityslot
+                ADD COLUMN IF NOT EXISTS window_utc tstzrange
+                GENERATED ALWAYS AS (tstzrange(start_dt_utc, end_dt_utc, '[)')) STORED
+            """
+        )
+    )
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS availabilityslot_window_gist ON availabilityslot USING gist(window_utc)"))
+
+    # The dual-written mirror table is no longer read or written
+    op.execute(sa.text("DROP INDEX IF EXISTS availability_once_gist"))
+    op.execute(sa.text("DROP TABLE IF EXISTS availability_once"))
+
+
+def downgrade() -> None:
+    op.execute(
+        sa.text(
+            """
+            CREATE TABLE IF NOT EXISTS availability_once (
+                id BIGSERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES "user"(id) ON DELETE CASCADE,
+                window_utc tstzrange NOT NULL
+            )
+            """
+        )
+    )
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS availability_once_gist ON availability_once USING gist(window_utc)"))
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO availability_once (user_id, window_utc)
+            SELECT user_id, window_utc FROM availabilityslot WHERE end_dt_utc > now()
+            """
+        )
+    )
+
+    op.execute(sa.text("DROP INDEX IF EXISTS availabilityslot_window_gist"))
+    op.execute(sa.text("ALTER TABLE availabilityslot DROP COLUMN IF EXISTS window_utc"))
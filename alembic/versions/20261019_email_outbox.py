@@ -0,0 +1,44 @@
+"""emailoutbox: durable queue for outbound mail
+
+Revision ID: 20261019_email_outbox
+Revises: 20261019_match_meetup_fk_indexes
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_email_outbox"
+down_revision = "20261019_match_meetup_fk_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "emailoutbox",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("to_addr", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("html", sa.String(), nullable=False),
+        sa.Column("text", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(now() AT TIME ZONE 'utc')")),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+    )
+    # The worker only ever scans due pending rows
+    op.create_index(
+        "ix_emailoutbox_pending",
+        "emailoutbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_emailoutbox_pending", table_name="emailoutbox")
+    op.drop_table("emailoutbox")
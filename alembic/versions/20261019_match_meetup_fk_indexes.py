@@ -0,0 +1,29 @@
+"""match/meetup: index foreign keys used by meetup listing
+
+Revision ID: 20261019_match_meetup_fk_indexes
+Revises: 20261019_availabilityslot_window_range
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_match_meetup_fk_indexes"
+down_revision = "20261019_availabilityslot_window_range"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Postgres does not index foreign keys on its own; the meetup list filters on
+    # match.a_user_id OR match.b_user_id and joins meetup.match_id
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_match_a_user_id ON match (a_user_id)"))
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_match_b_user_id ON match (b_user_id)"))
+    op.execute(sa.text("CREATE INDEX IF NOT EXISTS ix_meetup_match_id ON meetup (match_id)"))
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_meetup_match_id"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_match_b_user_id"))
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_match_a_user_id"))
@@ -8,10 +8,12 @@ bind = '0.0.0.0:8000'
 # Forwarded headers - allow all IPs to trust X-Forwarded-Proto headers
 forwarded_allow_ips = '*'
 
-# Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'gthread'
-threads = 3
+# Worker processes (src/backend/db.py sizes each worker's DB pool from the same variable)
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# ASGI worker: async routes share the event loop, sync routes run in AnyIO's thread
+# pool. Gunicorn's ``threads`` does not apply to it; that pool is sized by WEB_THREADS
+# and capped to the DB pool at app startup (db.apply_thread_limit)
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker')
 
 # Timeouts
 timeout = 30
@@ -42,6 +44,15 @@ graceful_timeout = 30
 reload = False
 reload_engine = 'auto'
 
+# Build heavy, read-only resources once in the preloaded master; forked (and
+# max_requests-recycled) workers inherit them instead of loading their own copy
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from src.backend.services.timezones import get_timezone_finder
+    get_timezone_finder()
+    server.log.info('Timezone data mapped in master')
+
 # Worker signal handling
 def worker_int(worker):
     worker.log.info('Worker received INT or QUIT signal')
@@ -25,6 +25,7 @@ if REPO_ROOT not in sys.path:
 
 from db import init_db, session_scope  # noqa: E402
 from models import AvailabilitySlot, Profile, User  # noqa: E402
+from services.availability import refresh_user_ranges  # noqa: E402
 from dev.bot_locale_data import EU_BOT_LOCALES  # noqa: E402
 
 MIGRATION_ROOT = Path(REPO_ROOT) / "migrations/2025-09-bot-normalization"
@@ -182,6 +183,7 @@ def ensure_slots_for_user(session, user_id: int, timezone_name: str, target_day:
         )
         session.add(slot)
         created_slots.append(f"{start_local.strftime('%Y-%m-%d %H:%M')}–{end_local.strftime('%H:%M')} {timezone_name}")
+    refresh_user_ranges(session, user_id)
     return created_slots
 
 
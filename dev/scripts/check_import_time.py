@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Import-time budget for the web app (what each gunicorn/uvicorn worker pays on start).
+
+Runs ``python -X importtime -c "import src.backend.main"`` in a fresh interpreter and
+fails (exit 1) when the cumulative import time exceeds the budget, or when a module
+that must stay lazy (loaded on first use, not at import) shows up.
+
+    python dev/scripts/check_import_time.py [--budget-ms 1500] [--top 15]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+
+# Heavy modules that the request-serving startup path must not import eagerly
+LAZY_MODULES = ("timezonefinder", "numpy", "redis")
+
+
+def profile_imports(module: str = "src.backend.main") -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import, in import order."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        # Only the traceback, not the importtime log
+        sys.stderr.write("\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:")) + "\n")
+        raise SystemExit(f"importing {module} failed")
+    rows: List[Tuple[str, int, int]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=15, help="Show the N slowest top-level imports")
+    args = parser.parse_args()
+
+    rows = profile_imports()
+    total_ms = next((cum for name, _, cum in rows if name == "src.backend.main"), 0) / 1000.0
+    loaded = {name for name, _, _ in rows}
+
+    print(f"src.backend.main: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, _, cum in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"  {cum / 1000.0:8.1f} ms  {name}")
+
+    failures = [f"{name} is imported at startup" for name in LAZY_MODULES if name in loaded]
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
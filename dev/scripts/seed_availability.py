@@ -12,6 +12,7 @@ from sqlmodel import select
 from db import session_scope, init_db
 from models import User, Profile, Radix, AvailabilitySlot, Match
 from services.scoring import score_pair
+from services.availability import refresh_user_ranges
 
 LOOKAHEAD_DAYS = 3
 SLOTS_PER_USER = (3, 6)  # inclusive range
@@ -57,6 +58,7 @@ def seed_availability() -> int:
                     continue
                 slot = AvailabilitySlot(user_id=u.id, start_dt_utc=start, end_dt_utc=end)
                 session.add(slot)
+                refresh_user_ranges(session, u.id)
                 session.commit()
                 total += 1
     return total
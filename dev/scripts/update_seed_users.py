@@ -18,6 +18,7 @@ if REPO_ROOT not in sys.path:
 
 from db import session_scope, DATABASE_URL
 from models import User, Profile, AvailabilitySlot
+from services.availability import refresh_user_ranges
 
 
 NEW_DOMAIN = "soultribe.chat"
@@ -101,6 +102,8 @@ def create_next_7_days_slots_for_user(session, user_id: int, live_tz: Optional[s
         )
         session.add(slot)
         created += 1
+    if created:
+        refresh_user_ranges(session, user_id)
     return created
 
 
@@ -1,26 +1,352 @@
 from __future__ import annotations
+import asyncio
+import multiprocessing
 import os
-from contextlib import contextmanager
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from fastapi import Request
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from dotenv import load_dotenv
-from sqlalchemy import text
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://localhost/soultribe")
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+# Optional streaming replica for read-only routes (get_read_session)
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL", "")
+# After a user's own write, their reads stay on the primary this long (covers replica lag)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "10"))
+
+# Pool sizing follows the web server layout (dev/config/gunicorn_config.py reads
+# WEB_CONCURRENCY too): each worker process gets its own pool, so Postgres needs about
+# WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+# Sync (``def``) routes and background tasks run in AnyIO's worker threads, not in
+# gunicorn threads (the Uvicorn worker has none); 40 is AnyIO's own default
+WEB_THREADS = int(os.getenv("WEB_THREADS", "40"))
+# Optional total budget (a share of Postgres max_connections) split across workers
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "0"))
+
+
+def _default_pool_size() -> int:
+    if DB_MAX_CONNECTIONS > 0:
+        return max(1, min(WEB_THREADS, DB_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY)))
+    return WEB_THREADS
+
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(_default_pool_size())))
+# The thread pool is capped at the sync pool size on startup (apply_thread_limit), so
+# every thread that needs a connection gets one without waiting
+SYNC_THREADS = max(1, min(WEB_THREADS, DB_POOL_SIZE))
+# Burst room for threads outside that pool (scripts, worker threads)
+DB_MAX_OVERFLOW = int(os.getenv(
+    "DB_MAX_OVERFLOW",
+    str(max(0, DB_MAX_CONNECTIONS // max(1, WEB_CONCURRENCY) - DB_POOL_SIZE) if DB_MAX_CONNECTIONS > 0 else 5),
+))
+# Pool of the asyncpg engine used by async routes (get_async_session); these requests
+# do not hold a thread while waiting, so it is sized for concurrent queries instead
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this are replaced at checkout (server/firewall idle limits)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Pre-ping costs a round trip per checkout; dead connections are instead caught by
+# TCP keepalives + recycle, and a disconnect error invalidates the whole pool
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "0") == "1"
+# Behind PgBouncer (transaction pooling) keep no connections of our own
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
+
+_CONNECT_ARGS = {
+    # libpq TCP keepalives: a peer that vanished is noticed within ~1 minute
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+_wait_lock = threading.Lock()
+_wait_stats = {"checkouts": 0, "wait_total_ms": 0.0, "wait_max_ms": 0.0, "waits_over_100ms": 0, "timeouts": 0}
+
+
+def _record_wait(seconds: float, timed_out: bool = False) -> None:
+    ms = seconds * 1000.0
+    with _wait_lock:
+        _wait_stats["checkouts"] += 1
+        _wait_stats["wait_total_ms"] += ms
+        if ms > _wait_stats["wait_max_ms"]:
+            _wait_stats["wait_max_ms"] = ms
+        if ms > 100:
+            _wait_stats["waits_over_100ms"] += 1
+        if timed_out:
+            _wait_stats["timeouts"] += 1
+
+
+class _TimedCheckout:
+    """Pool mixin that records how long each checkout waited (incl. new connects)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            _record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        _record_wait(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_kwargs() -> dict:
+    kwargs: dict = {"connect_args": dict(_CONNECT_ARGS)} if DATABASE_URL.startswith("postgresql+psycopg2") else {}
+    if DB_PGBOUNCER:
+        kwargs["poolclass"] = NullPool
+        return kwargs
+    kwargs.update(
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    return kwargs
+
+
+def _async_url(url: str):
+    """Same database as ``url``, through the asyncpg driver."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+
+def _async_engine_kwargs() -> dict:
+    if DB_PGBOUNCER:
+        # Transaction pooling cannot keep named prepared statements between transactions
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+    return {
+        "poolclass": TimedAsyncQueuePool,
+        "pool_size": DB_ASYNC_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(DATABASE_URL, **_engine_kwargs())
+read_engine = create_engine(DATABASE_REPLICA_URL, **_engine_kwargs()) if DATABASE_REPLICA_URL else engine
+# No connections are opened until first use, so forking workers after preload is safe
+async_engine = create_async_engine(_async_url(DATABASE_URL), **_async_engine_kwargs())
+async_read_engine = (
+    create_async_engine(_async_url(DATABASE_REPLICA_URL), **_async_engine_kwargs())
+    if DATABASE_REPLICA_URL
+    else async_engine
+)
+
+
+def pool_stats() -> dict:
+    """Pool configuration, current occupancy and checkout wait times for this process."""
+    with _wait_lock:
+        waits = dict(_wait_stats)
+    checkouts = waits["checkouts"]
+    stats = {
+        "mode": "pgbouncer" if DB_PGBOUNCER else "queue",
+        "replica": read_engine is not engine,
+        "pool_size": DB_POOL_SIZE,
+        "sync_threads": SYNC_THREADS,
+        "async_pool_size": DB_ASYNC_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "workers": WEB_CONCURRENCY,
+        "max_connections_needed": WEB_CONCURRENCY * (DB_POOL_SIZE + DB_ASYNC_POOL_SIZE + 2 * DB_MAX_OVERFLOW),
+        "checkouts": checkouts,
+        "wait_avg_ms": round(waits["wait_total_ms"] / checkouts, 3) if checkouts else 0.0,
+        "wait_max_ms": round(waits["wait_max_ms"], 3),
+        "waits_over_100ms": waits["waits_over_100ms"],
+        "timeouts": waits["timeouts"],
+    }
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        stats.update(checked_out=pool.checkedout(), idle=pool.checkedin(), overflow=max(0, pool.overflow()))
+    async_pool = async_engine.pool
+    if isinstance(async_pool, QueuePool):
+        stats.update(async_checked_out=async_pool.checkedout(), async_idle=async_pool.checkedin())
+    return stats
+
+
+def apply_thread_limit() -> None:
+    """Cap AnyIO's default thread pool (sync routes, background tasks) at SYNC_THREADS.
+
+    The limiter is per event loop, so call this from inside the running loop (app lifespan).
+    """
+    import anyio.to_thread
+
+    anyio.to_thread.current_default_thread_limiter().total_tokens = SYNC_THREADS
+
 
 def init_db() -> None:
     # ensure models are imported so tables are registered
     import src.backend.models  # noqa: F401
     SQLModel.metadata.create_all(engine)
 
-def get_session():
+
+# ---- Read-your-writes tracking (only active with a replica) ----
+
+_recent_writes: dict[str, float] = {}
+_recent_writes_lock = threading.Lock()
+
+
+def _request_user_key(request: Optional[Request]) -> Optional[str]:
+    if request is None:
+        return None
+    scheme, _, token = (request.headers.get("authorization") or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    from src.backend.services.jwt_auth import verify_token
+
+    try:
+        sub = verify_token(token.strip()).get("sub")
+    except ValueError:
+        return None
+    return str(sub) if sub is not None else None
+
+
+def _note_write_local(user_key: str) -> None:
+    deadline = time.monotonic() + READ_YOUR_WRITES_SECONDS
+    with _recent_writes_lock:
+        _recent_writes[user_key] = deadline
+        if len(_recent_writes) > 10000:
+            now = time.monotonic()
+            for key in [k for k, d in _recent_writes.items() if d <= now]:
+                del _recent_writes[key]
+
+
+def _publish_write(user_key: str) -> None:
+    # Other worker processes learn about the write through Redis, when available
+    from src.backend.services.redis_client import cache_set
+
+    cache_set(f"ryw:{user_key}", b"1", max(1, int(READ_YOUR_WRITES_SECONDS + 0.999)))
+
+
+def note_write(user_key: str) -> None:
+    """Pin ``user_key``'s reads to the primary for READ_YOUR_WRITES_SECONDS."""
+    _note_write_local(user_key)
+    _publish_write(user_key)
+
+
+def wrote_recently(user_key: str) -> bool:
+    with _recent_writes_lock:
+        deadline = _recent_writes.get(user_key)
+    if deadline is not None and deadline > time.monotonic():
+        return True
+    from src.backend.services.redis_client import cache_get
+
+    return cache_get(f"ryw:{user_key}") is not None
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement(orm_execute_state) -> None:
+    # Bulk update()/delete() statements write without a flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _note_committed_write(session) -> None:
+    user_key = session.info.get("user_key")
+    if not (session.info.pop("wrote", False) and user_key):
+        return
+    if session.info.get("async"):
+        # AsyncSession commits run on the event loop; the Redis call goes to a thread
+        _note_write_local(user_key)
+        asyncio.get_running_loop().run_in_executor(None, _publish_write, user_key)
+    else:
+        note_write(user_key)
+
+
+def get_session(request: Request = None):
     """FastAPI dependency that yields a Session for the duration of the request."""
     with Session(engine) as session:
+        if read_engine is not engine:
+            session.info["user_key"] = _request_user_key(request)
         yield session
 
+
+def get_read_session(request: Request = None):
+    """Like get_session, but on the replica when one is configured.
+
+    For read-only routes. A user who committed a write within the last
+    READ_YOUR_WRITES_SECONDS still reads from the primary, so they see it.
+    """
+    bind = read_engine
+    if read_engine is not engine:
+        user_key = _request_user_key(request)
+        if user_key and wrote_recently(user_key):
+            bind = engine
+    with Session(bind) as session:
+        yield session
+
+
+async def get_async_session(request: Request = None):
+    """Async counterpart of get_session for ``async def`` routes (asyncpg).
+
+    Waiting on the database does not hold a threadpool thread, so a worker can
+    serve many such requests at once. Objects stay loaded after commit.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        if async_read_engine is not async_engine:
+            session.sync_session.info["user_key"] = _request_user_key(request)
+            session.sync_session.info["async"] = True
+        yield session
+
+
+async def get_async_read_session(request: Request = None):
+    """Async counterpart of get_read_session (replica unless the user wrote recently)."""
+    bind = async_read_engine
+    if async_read_engine is not async_engine:
+        user_key = _request_user_key(request)
+        # wrote_recently may ask Redis; keep that off the event loop
+        if user_key and await run_in_threadpool(wrote_recently, user_key):
+            bind = async_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+
 @contextmanager
 def session_scope():
     """Context manager for scripts/tests to get a Session."""
     with Session(engine) as session:
         yield session
+
+
+@asynccontextmanager
+async def async_session_scope():
+    """Async session_scope, on the primary (e.g. a write from an async read route)."""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,11 +1,11 @@
 from __future__ import annotations
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from src.backend.db import init_db
 from src.backend.routes import profile as profile_routes
 from src.backend.routes import match as match_routes
 from src.backend.routes import auth as auth_routes
@@ -13,6 +13,7 @@ from src.backend.routes import meetup as meetup_routes
 from src.backend.routes import availability as availability_routes
 from src.backend.routes import timezone as timezone_routes
 from src.backend.routes import admin as admin_routes
+from src.backend.db import apply_thread_limit
 
 
 class ProxyHeadersMiddleware(BaseHTTPMiddleware):
@@ -31,13 +32,20 @@ class ProxyHeadersMiddleware(BaseHTTPMiddleware):
         return response
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes run in AnyIO's thread pool; keep it within the DB pool size
+    apply_thread_limit()
+    yield
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="SoulTribe.chat API")
+    app = FastAPI(title="SoulTribe.chat API", lifespan=lifespan)
     
     # Add ProxyHeadersMiddleware to handle forwarded headers from Nginx
     app.add_middleware(ProxyHeadersMiddleware)
     
-    init_db()
+    # The schema is managed by Alembic (`alembic upgrade head`), not at worker startup
     app.include_router(auth_routes.router)
     app.include_router(profile_routes.router)
     app.include_router(match_routes.router)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 
 from sqlmodel import SQLModel, Field, Column, JSON
+from sqlalchemy import Computed, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import TSTZRANGE
 from pydantic import ConfigDict
 
 """
@@ -76,8 +78,8 @@ class Radix(SQLModel, table=True):
 
 class Match(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    a_user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
-    b_user_id: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    a_user_id: int = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
+    b_user_id: int = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
     score_numeric: int
     score_json: dict = Field(sa_column=Column(JSON))
     status: str = Field(default="suggested")
@@ -87,7 +89,7 @@ class Match(SQLModel, table=True):
 
 class Meetup(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    match_id: int = Field(foreign_key="match.id", ondelete="CASCADE")
+    match_id: int = Field(foreign_key="match.id", ondelete="CASCADE", index=True)
     proposed_dt_utc: datetime | None = None
     confirmed_dt_utc: datetime | None = None
     jitsi_room: str | None = None
@@ -104,14 +106,40 @@ class GeoCache(SQLModel, table=True):
 
 
 class AvailabilitySlot(SQLModel, table=True):
+    __table_args__ = (
+        Index("availabilityslot_window_gist", "window_utc", postgresql_using="gist"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
-    start_dt_utc: datetime
-    end_dt_utc: datetime
+    start_dt_utc: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    end_dt_utc: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
     start_dt_local: datetime | None = None  # User's local time when slot was created
     end_dt_local: datetime | None = None    # User's local time when slot was created
     timezone: str | None = None             # User's timezone (IANA) when slot was created
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # [start_dt_utc, end_dt_utc) maintained by Postgres; used for overlap queries
+    window_utc: Any | None = Field(
+        default=None,
+        sa_column=Column(TSTZRANGE, Computed("tstzrange(start_dt_utc, end_dt_utc, '[)')", persisted=True)),
+    )
+
+
+class AvailabilityRange(SQLModel, table=True):
+    # Each user's slots merged into disjoint ranges; rewritten by
+    # services/availability.refresh_user_ranges whenever that user's slots change
+    __table_args__ = (
+        Index("availabilityrange_window_gist", "window_utc", postgresql_using="gist"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE", index=True)
+    start_dt_utc: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    end_dt_utc: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    window_utc: Any | None = Field(
+        default=None,
+        sa_column=Column(TSTZRANGE, Computed("tstzrange(start_dt_utc, end_dt_utc, '[)')", persisted=True)),
+    )
 
 
 class RefreshToken(SQLModel, table=True):
@@ -123,3 +151,54 @@ class RefreshToken(SQLModel, table=True):
     revoked_at: datetime | None = None
     client_ip: str | None = None
     user_agent: str | None = None
+
+
+class EmailOutbox(SQLModel, table=True):
+    # Outbound mail queued by request handlers, delivered by services/email_outbox.py
+    __table_args__ = (
+        Index("ix_emailoutbox_pending", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    to_addr: str
+    subject: str
+    html: str
+    text: str | None = None
+    status: str = Field(default="pending")  # pending | sent | failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: datetime | None = None
+
+
+class AnnotationJob(SQLModel, table=True):
+    # Queued AI comment generation, processed by services/annotation_jobs.py
+    __table_args__ = (
+        # At most one live job per (match, lang, perspective); duplicates coalesce onto it
+        Index(
+            "ux_annotationjob_active",
+            "match_id",
+            "lang",
+            "perspective",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_annotationjob_queued", "id", postgresql_where=text("status = 'queued'")),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    match_id: int = Field(foreign_key="match.id", ondelete="CASCADE", index=True)
+    lang: str
+    # Every language this job generates, ``lang`` first; None means just ``lang``
+    langs: list[str] | None = Field(default=None, sa_column=Column(JSON))
+    perspective: str  # "A" | "B"
+    requested_by: int = Field(foreign_key="user.id", ondelete="CASCADE")
+    status: str = Field(default="queued")  # queued | running | done | failed
+    attempts: int = Field(default=0)
+    # A retried job is not claimed again before this time (exponential backoff)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
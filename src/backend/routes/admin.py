@@ -7,10 +7,12 @@ import os
 from sqlmodel import select, func
 from sqlalchemy import delete
 
-from src.backend.db import get_session
+from src.backend.db import get_read_session, get_session, pool_stats
 from sqlmodel import Session
 from src.backend.models import User, Profile, Radix, AvailabilitySlot, Meetup, Match, EmailVerificationToken, PasswordResetToken
-from src.backend.services.jwt_auth import get_current_user_id
+from src.backend.services import geocache, llm_cache
+from src.backend.services.jwt_auth import get_current_user_id, token_cache_stats
+from src.backend.services.timezones import zone_lookup_stats
 
 router = APIRouter(prefix="/api/admin", tags=["admin"]) 
 
@@ -49,7 +51,7 @@ def _is_admin(request: Request, user_id: int | None = None) -> bool:
 @router.get("/stats")
 def get_stats(
     request: Request,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_read_session),
     user_id: int = Depends(get_current_user_id),
 ) -> dict[str, Any]:
     if not _is_admin(request, user_id):
@@ -144,6 +146,11 @@ def get_stats(
         "interpretations": interpretations,
         "recent": sorted(recent, key=lambda r: r.get("ts",""), reverse=True)[:50],
         "breakdown": breakdown,
+        "llm_cache": llm_cache.stats(),
+        "jwt_cache": token_cache_stats(),
+        "db_pool": pool_stats(),
+        "tz_lookup": zone_lookup_stats(),
+        "geocache": geocache.stats(),
         "generated_at": now.isoformat() + "Z",
     }
 
@@ -2,20 +2,22 @@ from __future__ import annotations
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Depends
+import logging
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends
 from pydantic import BaseModel, EmailStr, Field
 from sqlmodel import select
 from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
 import secrets
-from argon2 import PasswordHasher
 import os
 
-from src.backend.db import get_session
+from src.backend.db import get_session, session_scope
 from src.backend.models import User, Profile, Radix, EmailVerificationToken, PasswordResetToken
 from src.backend.services.radix import compute_radix_json
 from src.backend.services.jwt_auth import create_access_token
 from src.backend.services.jwt_auth import get_current_user_id
 from src.backend.services.email import send_email
+from src.backend.services.passwords import PasswordHasherBusy, hash_password, needs_rehash, verify_password
 from fastapi import Request
 from src.backend.routes import admin as admin_routes
 from src.backend.services.rate_limit import rate_limit
@@ -30,7 +32,7 @@ from src.backend.services.bot_slot_scheduler import schedule_random_bot_slot
 from src.backend.services.activity_log import log_event
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
-ph = PasswordHasher()
+logger = logging.getLogger("soultribe.auth")
 
 RESEND_VERIFICATION_COOLDOWN = timedelta(minutes=10)
 VERIFICATION_TOKEN_TTL = timedelta(hours=24)
@@ -48,6 +50,10 @@ def _to_naive_utc(dt: datetime) -> datetime:
         return dt
 
 
+def _hashing_busy(exc: PasswordHasherBusy) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "2"})
+
+
 def _client_ip(request: Request | None) -> str | None:
     if not request:
         return None
@@ -119,18 +125,54 @@ class RefreshOut(LoginOut):
     pass
 
 
+def _store_initial_radix(user_id: int, birth_dt_utc: datetime, birth_time_known: bool, lat: Optional[float], lon: Optional[float]) -> None:
+    """Background task after registration: compute and store the first radix snapshot."""
+    try:
+        rjson = compute_radix_json(
+            birth_dt_utc=birth_dt_utc,
+            birth_time_known=birth_time_known,
+            lat=lat,
+            lon=lon,
+        )
+        with session_scope() as session:
+            if session.get(Radix, user_id) is None:
+                session.add(Radix(user_id=user_id, ref_dt_utc=birth_dt_utc, json=rjson))
+                session.commit()
+    except Exception:
+        logger.exception("register: radix computation failed user=%s", user_id)
+
+
+def _send_email_quietly(to: str, subject: str, html: str, text: str) -> None:
+    try:
+        send_email(to, subject, html, text)
+    except Exception:
+        # Do not fail registration side effects if email fails in dev
+        logger.exception("register: verification email failed")
+
+
 @router.post("/register", response_model=RegisterOut)
-def register(payload: RegisterIn, request: Request, session=Depends(get_session)):
+def register(payload: RegisterIn, request: Request, background_tasks: BackgroundTasks, session=Depends(get_session)):
     # check for duplicate email
     existing = session.exec(select(User).where(User.email == payload.email)).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    # create user
-    user = User(email=payload.email, password_hash=ph.hash(payload.password))
+    try:
+        password_hash = hash_password(payload.password)
+    except PasswordHasherBusy as exc:
+        raise _hashing_busy(exc)
+
+    # User, profile, verification and refresh token go in as one transaction; the
+    # flush only assigns user.id for the rows that reference it
+    user = User(email=payload.email, password_hash=password_hash)
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    try:
+        session.flush()
+    except IntegrityError:
+        # Concurrent signup with the same email won the unique index; the INSERT
+        # (and so the violation) happens at this flush, not at commit
+        session.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     # create initial profile with required display_name; optional fields can follow
     prof = Profile(user_id=user.id, display_name=payload.display_name)
@@ -158,20 +200,6 @@ def register(payload: RegisterIn, request: Request, session=Depends(get_session)
     if payload.lang_secondary is not None:
         prof.lang_secondary = payload.lang_secondary
 
-    session.commit()
-
-    # compute radix snapshot if we have birth_dt_utc
-    if prof.birth_dt_utc is not None:
-        rjson = compute_radix_json(
-            birth_dt_utc=prof.birth_dt_utc,
-            birth_time_known=prof.birth_time_known,
-            lat=prof.birth_lat,
-            lon=prof.birth_lon,
-        )
-        radix = Radix(user_id=user.id, ref_dt_utc=prof.birth_dt_utc, json=rjson)
-        session.add(radix)
-        session.commit()
-
     # Create email verification token (24h expiry)
     now = _utcnow_naive()
     raw = secrets.token_urlsafe(32)
@@ -182,10 +210,31 @@ def register(payload: RegisterIn, request: Request, session=Depends(get_session)
         expires_at=now + timedelta(hours=24),
     )
     session.add(ver)
+
+    # A brand-new user has no older refresh tokens, so nothing to purge
+    refresh_raw, refresh_rec = mint_refresh_token(
+        user.id,
+        client_ip=_client_ip(request),
+        user_agent=request.headers.get("user-agent") if request else None,
+    )
+    session.add(refresh_rec)
     session.commit()
 
+    user_id, email = user.id, user.email
+
+    # Radix snapshot and verification email run after the response is sent
+    if birth_dt_utc is not None:
+        background_tasks.add_task(
+            _store_initial_radix,
+            user_id,
+            birth_dt_utc,
+            bool(payload.birth_time_known),
+            payload.birth_lat,
+            payload.birth_lon,
+        )
+
     # Return an access token for immediate use and a verification URL (MVP)
-    token = create_access_token({"sub": str(user.id), "email": user.email})
+    token = create_access_token({"sub": str(user_id), "email": email})
     verification_url = f"/api/auth/verify-email?token={raw}"
 
     # Always use production URL for email verification links
@@ -199,25 +248,11 @@ def register(payload: RegisterIn, request: Request, session=Depends(get_session)
       <p><a href=\"{absolute_link}\">Verify Email</a></p>
       <p>This link expires in 24 hours.</p>
     """
-    try:
-        send_email(user.email, subj, html, text)
-    except Exception:
-        # Do not block registration if email fails in dev
-        pass
-
-    refresh_raw, refresh_rec = mint_refresh_token(
-        user.id,
-        client_ip=_client_ip(request),
-        user_agent=request.headers.get("user-agent") if request else None,
-    )
-    session.add(refresh_rec)
-    session.flush()
-    purge_old_refresh_tokens(session, user)
-    session.commit()
+    background_tasks.add_task(_send_email_quietly, email, subj, html, text)
 
     return RegisterOut(
         ok=True,
-        user_id=user.id,
+        user_id=user_id,
         access_token=token,
         token_type="bearer",
         refresh_token=refresh_raw,
@@ -231,8 +266,10 @@ def login(payload: LoginIn, request: Request, session=Depends(get_session)):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     try:
-        ph.verify(user.password_hash, payload.password)
-    except Exception:
+        valid = verify_password(user.password_hash, payload.password)
+    except PasswordHasherBusy as exc:
+        raise _hashing_busy(exc)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Check if email is verified; allow localhost bypass for local dev
@@ -252,6 +289,14 @@ def login(payload: LoginIn, request: Request, session=Depends(get_session)):
     except Exception:
         pass
 
+    # Upgrade hashes made with older argon2 parameters while we have the password
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(payload.password)
+            session.add(user)
+        except PasswordHasherBusy:
+            pass  # next login will try again
+
     refresh_raw, refresh_rec = mint_refresh_token(
         user.id,
         client_ip=_client_ip(request),
@@ -410,7 +455,10 @@ def reset_password(payload: ResetPerformIn, session=Depends(get_session)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     # Set new password
-    user.password_hash = ph.hash(payload.new_password)
+    try:
+        user.password_hash = hash_password(payload.new_password)
+    except PasswordHasherBusy as exc:
+        raise _hashing_busy(exc)
     rec.used_at = now
     session.add(user)
     session.add(rec)
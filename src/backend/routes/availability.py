@@ -1,17 +1,18 @@
 from __future__ import annotations
-from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
+from datetime import datetime, time, timedelta, timezone
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from sqlmodel import select
-from sqlalchemy import text
+from sqlalchemy import insert
 
-from src.backend.db import get_session
+from src.backend.db import get_async_read_session, get_async_session, get_session
 from src.backend.models import AvailabilitySlot
 from src.backend.services.jwt_auth import get_current_user_id
 from src.backend.services.activity_log import log_event
+from src.backend.services.availability import refresh_user_ranges
+from src.backend.services.timezones import get_zone, localize
 
 router = APIRouter(prefix="/api/availability", tags=["availability"])
 
@@ -62,6 +63,7 @@ class SlotIn(BaseModel):
                 return dt
             except Exception as ex:
                 # print(f"Local parse failed for '{v}': {ex}")
+                pass
         return v
 
 
@@ -75,24 +77,14 @@ class SlotOut(BaseModel):
 
 
 @router.get("", response_model=List[SlotOut])
-def list_slots(session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
-    # Purge expired slots (no one can meet in the past)
+async def list_slots(session=Depends(get_async_read_session), user_id: int = Depends(get_current_user_id)):
+    # Expired slots are hidden here and deleted by soultribe_cleanup.py (this may run on a replica)
     now = datetime.now(timezone.utc)
-    expired = session.exec(
-        select(AvailabilitySlot).where(
-            (AvailabilitySlot.user_id == user_id) & (AvailabilitySlot.end_dt_utc <= now)
-        )
-    ).all()
-    if expired:
-        for r in expired:
-            session.delete(r)
-        session.commit()
-
-    rows = session.exec(
+    rows = (await session.exec(
         select(AvailabilitySlot)
-        .where(AvailabilitySlot.user_id == user_id)
+        .where((AvailabilitySlot.user_id == user_id) & (AvailabilitySlot.end_dt_utc > now))
         .order_by(AvailabilitySlot.start_dt_utc)
-    ).all()
+    )).all()
     # Ensure timezone info is preserved in response
     result = []
     for r in rows:
@@ -118,29 +110,34 @@ def list_slots(session=Depends(get_session), user_id: int = Depends(get_current_
     return result
 
 
-@router.post("", response_model=SlotOut)
-def create_slot(payload: SlotIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
-    # Normalize to UTC-aware
+def _as_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _window_utc(payload: SlotIn) -> tuple[datetime, datetime]:
+    """Resolve the UTC window of an incoming slot.
+
+    When local times and a timezone are present, UTC is always recomputed on the server.
+    """
     s = payload.start_dt_utc
     e = payload.end_dt_utc
-    # Datetimes should already be UTC from the validator
-    # print(f"Backend received: start={s} (tz={s.tzinfo}), end={e} (tz={e.tzinfo})")
-    # print(f"Raw payload: start_dt_utc={payload.start_dt_utc}, end_dt_utc={payload.end_dt_utc}")
 
     # 1) If the incoming payload fields are still strings with 'Z', force-parse them to aware UTC
     #    This must happen BEFORE any recomputation below.
     if isinstance(payload.start_dt_utc, str) and payload.start_dt_utc.endswith('Z'):
         s = datetime.fromisoformat(payload.start_dt_utc[:-1]).replace(tzinfo=timezone.utc)
-        # print(f"Force parsed start: {s}")
     if isinstance(payload.end_dt_utc, str) and payload.end_dt_utc.endswith('Z'):
         e = datetime.fromisoformat(payload.end_dt_utc[:-1]).replace(tzinfo=timezone.utc)
-        # print(f"Force parsed end: {e}")
 
     # 2) If client also sent local times and timezone, ALWAYS recompute UTC on the server
     try:
         if payload.timezone and payload.start_dt_local and payload.end_dt_local:
             tzname = str(payload.timezone).strip()
-            tzinfo = ZoneInfo(tzname)
+            tzinfo = get_zone(tzname)
+            if tzinfo is None:
+                raise ValueError(f"Unknown timezone: {tzname}")
             s_local = payload.start_dt_local
             e_local = payload.end_dt_local
             # Attach tz to naive locals (treat as wall time in tz)
@@ -152,17 +149,17 @@ def create_slot(payload: SlotIn, session=Depends(get_session), user_id: int = De
                 e_local = e_local.replace(tzinfo=tzinfo)
             else:
                 e_local = e_local.astimezone(tzinfo)
-
-            recomputed_s = s_local.astimezone(timezone.utc)
-            recomputed_e = e_local.astimezone(timezone.utc)
-            # print(f"Recomputed from local: start={recomputed_s}, end={recomputed_e}")
-            s, e = recomputed_s, recomputed_e
+            s, e = s_local.astimezone(timezone.utc), e_local.astimezone(timezone.utc)
     except Exception as ex:
         # print(f"Warning: failed to recompute UTC from local/timezone: {ex}")
+        pass
+    return s, e
+
+
+def _validate_window(s: datetime, e: datetime, now: datetime) -> None:
     if e <= s:
         raise HTTPException(status_code=400, detail="end_dt_utc must be after start_dt_utc")
     # Disallow past slots
-    now = datetime.now(timezone.utc)
     if e <= now:
         raise HTTPException(status_code=400, detail="Cannot create availability in the past")
 
@@ -178,25 +175,44 @@ def create_slot(payload: SlotIn, session=Depends(get_session), user_id: int = De
     if duration_secs < 3600 or (duration_secs % 3600) != 0:
         raise HTTPException(status_code=400, detail="Minimum window is 1 hour, in whole-hour steps")
 
-    # Get local times and timezone from payload
-    s_local = payload.start_dt_local
-    e_local = payload.end_dt_local
-    tz = payload.timezone
-    
-    # print(f"Backend storing: start={s} (tz={s.tzinfo}), end={e} (tz={e.tzinfo})")
-    # print(f"Local times: start_local={s_local}, end_local={e_local}, timezone={tz}")
-    
+
+def _slot_out(slot: AvailabilitySlot) -> SlotOut:
+    # Ensure timezone info is preserved in response
+    start_out = _as_utc(slot.start_dt_utc)
+    end_out = _as_utc(slot.end_dt_utc)
+    # Compute local outputs from stored UTC using provided timezone, if available
+    out_start_local = slot.start_dt_local
+    out_end_local = slot.end_dt_local
+    local = localize((start_out, end_out), slot.timezone)
+    if local:
+        out_start_local, out_end_local = local
+    return SlotOut(
+        id=slot.id,
+        start_dt_utc=start_out,
+        end_dt_utc=end_out,
+        start_dt_local=out_start_local,
+        end_dt_local=out_end_local,
+        timezone=slot.timezone,
+    )
+
+
+@router.post("", response_model=SlotOut)
+async def create_slot(payload: SlotIn, session=Depends(get_async_session), user_id: int = Depends(get_current_user_id)):
+    s, e = _window_utc(payload)
+    _validate_window(s, e, datetime.now(timezone.utc))
+
     slot = AvailabilitySlot(
-        user_id=user_id, 
-        start_dt_utc=s, 
+        user_id=user_id,
+        start_dt_utc=s,
         end_dt_utc=e,
-        start_dt_local=s_local,
-        end_dt_local=e_local,
-        timezone=tz
+        start_dt_local=payload.start_dt_local,
+        end_dt_local=payload.end_dt_local,
+        timezone=payload.timezone,
     )
     session.add(slot)
-    session.commit()
-    session.refresh(slot)
+    await session.run_sync(refresh_user_ranges, user_id)
+    await session.commit()
+    await session.refresh(slot)
     log_event(
         "availability.create",
         actor_user_id=user_id,
@@ -207,50 +223,110 @@ def create_slot(payload: SlotIn, session=Depends(get_session), user_id: int = De
             "timezone": slot.timezone,
         },
     )
-    # print(f"Backend returning: start={slot.start_dt_utc} (tz={getattr(slot.start_dt_utc, 'tzinfo', None)})")
-    # Best-effort dual write into availability_once tstzrange table (Postgres)
-    try:
-        stmt = text(
-            """
-            INSERT INTO availability_once (user_id, window_utc)
-            VALUES (:uid, tstzrange(:s, :e, '[)'))
-            ON CONFLICT DO NOTHING
-            """
-        ).bindparams(uid=user_id, s=s, e=e)
-        session.exec(stmt)
-        session.commit()
-    except Exception as ex:
-        # Do not fail request if the auxiliary table is missing
-        # print(f"availability_once dual-write skipped: {ex}")
-    # Ensure timezone info is preserved in response
-    start_out = slot.start_dt_utc
-    end_out = slot.end_dt_utc
-    if start_out.tzinfo is None:
-        start_out = start_out.replace(tzinfo=timezone.utc)
-    else:
-        start_out = start_out.astimezone(timezone.utc)
-    if end_out.tzinfo is None:
-        end_out = end_out.replace(tzinfo=timezone.utc)
-    else:
-        end_out = end_out.astimezone(timezone.utc)
-    # Compute local outputs from stored UTC using provided timezone, if available
-    out_start_local = slot.start_dt_local
-    out_end_local = slot.end_dt_local
-    if slot.timezone:
+    return _slot_out(slot)
+
+
+# Upper bound for windows created by one batch request (explicit + expanded weekly)
+MAX_BATCH_WINDOWS = 500
+MAX_BATCH_WEEKS = 8
+
+
+class WeeklyPatternIn(BaseModel):
+    """Recurring weekly window, expanded server-side into concrete slots.
+
+    Times are wall-clock times in ``timezone``; ``end_time`` at or before
+    ``start_time`` means the window ends on the following day.
+    """
+    weekday: int = Field(ge=0, le=6, description="0=Monday … 6=Sunday")
+    start_time: time
+    end_time: time
+    timezone: str
+    weeks: int = Field(default=1, ge=1, le=MAX_BATCH_WEEKS)
+
+
+class SlotBatchIn(BaseModel):
+    slots: List[SlotIn] = Field(default_factory=list)
+    weekly: List[WeeklyPatternIn] = Field(default_factory=list)
+
+
+def _expand_weekly(pattern: WeeklyPatternIn, now: datetime) -> List[SlotIn]:
+    tzname = pattern.timezone.strip()
+    tzinfo = get_zone(tzname)
+    if tzinfo is None:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tzname}")
+    today = now.astimezone(tzinfo).date()
+    first = today + timedelta(days=(pattern.weekday - today.weekday()) % 7)
+    out: List[SlotIn] = []
+    for week in range(pattern.weeks):
+        day = first + timedelta(weeks=week)
+        s_local = datetime.combine(day, pattern.start_time)
+        e_local = datetime.combine(day, pattern.end_time)
+        if e_local <= s_local:
+            e_local += timedelta(days=1)
+        s_utc = s_local.replace(tzinfo=tzinfo).astimezone(timezone.utc)
+        e_utc = e_local.replace(tzinfo=tzinfo).astimezone(timezone.utc)
+        # The first occurrence may already be over today; skip rather than reject
+        if e_utc <= now:
+            continue
+        out.append(SlotIn(
+            start_dt_utc=s_utc,
+            end_dt_utc=e_utc,
+            start_dt_local=s_local,
+            end_dt_local=e_local,
+            timezone=tzname,
+        ))
+    return out
+
+
+@router.post("/batch", response_model=List[SlotOut])
+def create_slots_batch(payload: SlotBatchIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
+    """Create many windows at once: validated in one pass, inserted with one statement."""
+    now = datetime.now(timezone.utc)
+    windows = list(payload.slots)
+    for pattern in payload.weekly:
+        windows.extend(_expand_weekly(pattern, now))
+    if not windows:
+        raise HTTPException(status_code=400, detail="No availability windows given")
+    if len(windows) > MAX_BATCH_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_WINDOWS} windows per batch")
+
+    rows: List[dict] = []
+    for idx, win in enumerate(windows):
+        s, e = _window_utc(win)
         try:
-            tzinfo = ZoneInfo(slot.timezone)
-            out_start_local = start_out.astimezone(tzinfo)
-            out_end_local = end_out.astimezone(tzinfo)
-        except Exception:
-            pass
-    return SlotOut(
-        id=slot.id,
-        start_dt_utc=start_out,
-        end_dt_utc=end_out,
-        start_dt_local=out_start_local,
-        end_dt_local=out_end_local,
-        timezone=slot.timezone,
+            _validate_window(s, e, now)
+        except HTTPException as exc:
+            raise HTTPException(status_code=exc.status_code, detail=f"Window {idx}: {exc.detail}")
+        rows.append({
+            "user_id": user_id,
+            "start_dt_utc": s,
+            "end_dt_utc": e,
+            "start_dt_local": win.start_dt_local,
+            "end_dt_local": win.end_dt_local,
+            "timezone": win.timezone,
+            "created_at": datetime.utcnow(),
+        })
+
+    # One multi-row INSERT; ids come back in parameter order
+    ids = session.exec(
+        insert(AvailabilitySlot).returning(AvailabilitySlot.id, sort_by_parameter_order=True),
+        params=rows,
+    ).scalars().all()
+    refresh_user_ranges(session, user_id)
+    session.commit()
+
+    created = [AvailabilitySlot(id=slot_id, **row) for slot_id, row in zip(ids, rows)]
+    log_event(
+        "availability.create_batch",
+        actor_user_id=user_id,
+        metadata={
+            "count": len(created),
+            "slot_ids": list(ids),
+            "start_dt_utc": min(r["start_dt_utc"] for r in rows).isoformat(),
+            "end_dt_utc": max(r["end_dt_utc"] for r in rows).isoformat(),
+        },
     )
+    return [_slot_out(slot) for slot in created]
 
 
 class SlotUpdateIn(BaseModel):
@@ -310,7 +386,9 @@ def update_slot(slot_id: int, payload: SlotUpdateIn, session=Depends(get_session
     try:
         if payload.timezone and payload.start_dt_local and payload.end_dt_local:
             tzname = str(payload.timezone).strip()
-            tzinfo = ZoneInfo(tzname)
+            tzinfo = get_zone(tzname)
+            if tzinfo is None:
+                raise ValueError(f"Unknown timezone: {tzname}")
             s_local = payload.start_dt_local
             e_local = payload.end_dt_local
             if s_local.tzinfo is None:
@@ -330,6 +408,7 @@ def update_slot(slot_id: int, payload: SlotUpdateIn, session=Depends(get_session
             slot.end_dt_local = e_local.replace(tzinfo=None)
     except Exception as ex:
         # print(f"update_slot: failed to recompute from local/timezone: {ex}")
+        pass
     if e <= s:
         raise HTTPException(status_code=400, detail="end_dt_utc must be after start_dt_utc")
 
@@ -358,18 +437,18 @@ def update_slot(slot_id: int, payload: SlotUpdateIn, session=Depends(get_session
     out_start_local = None
     out_end_local = None
     if getattr(slot, "timezone", None):
-        try:
-            tzinfo = ZoneInfo(slot.timezone)
-            out_start_local = s.astimezone(tzinfo)
-            out_end_local = e.astimezone(tzinfo)
-            slot.start_dt_local = out_start_local.replace(tzinfo=None) if out_start_local.tzinfo else out_start_local
-            slot.end_dt_local = out_end_local.replace(tzinfo=None) if out_end_local.tzinfo else out_end_local
-        except Exception:
+        local = localize((s, e), slot.timezone)
+        if local:
+            out_start_local, out_end_local = local
+            slot.start_dt_local = out_start_local.replace(tzinfo=None)
+            slot.end_dt_local = out_end_local.replace(tzinfo=None)
+        else:
             # If timezone invalid, null out locals to force client fallback rendering
             slot.start_dt_local = None
             slot.end_dt_local = None
 
     session.add(slot)
+    refresh_user_ranges(session, user_id)
     session.commit()
     session.refresh(slot)
     log_event(
@@ -382,19 +461,6 @@ def update_slot(slot_id: int, payload: SlotUpdateIn, session=Depends(get_session
             "timezone": slot.timezone,
         },
     )
-    # Best-effort: maintain availability_once range index
-    try:
-        stmt2 = text(
-            """
-            INSERT INTO availability_once (user_id, window_utc)
-            VALUES (:uid, tstzrange(:s, :e, '[)'))
-            """
-        ).bindparams(uid=user_id, s=slot.start_dt_utc, e=slot.end_dt_utc)
-        session.exec(stmt2)
-        session.commit()
-    except Exception as ex:
-        # print(f"availability_once update skipped: {ex}")
-
     # Normalize UTC for response
     start_out = slot.start_dt_utc if slot.start_dt_utc.tzinfo else slot.start_dt_utc.replace(tzinfo=timezone.utc)
     end_out = slot.end_dt_utc if slot.end_dt_utc.tzinfo else slot.end_dt_utc.replace(tzinfo=timezone.utc)
@@ -424,6 +490,7 @@ def delete_slot(slot_id: int, session=Depends(get_session), user_id: int = Depen
         "timezone": slot.timezone,
     }
     session.delete(slot)
+    refresh_user_ranges(session, user_id)
     session.commit()
     log_event("availability.delete", actor_user_id=user_id, metadata=metadata)
     return {"deleted": True}
@@ -2,25 +2,43 @@ from __future__ import annotations
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 import hashlib
 import json
 
 from src.backend.services.scoring import score_pair
-from src.backend.services.availability import intersect_hourly_slots
+from src.backend.services.availability import find_overlaps
+from src.backend.services.timezones import localize_many
 from sqlalchemy import text
-from src.backend.db import get_session
-from src.backend.models import Radix, Profile, User, AvailabilitySlot
-from src.backend.models import Match
+from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
+from src.backend.db import get_async_read_session, get_session, session_scope
+from src.backend.models import Radix, Profile, User
+from src.backend.models import AnnotationJob, Match
 from src.backend.services.jwt_auth import get_current_user_id
 from src.backend.services.rate_limit import rate_limit
 from src.backend.services.audit import log_match_annotation
 from src.backend.services.redis_client import cache_get, cache_set
-import re
-import subprocess
+from src.backend.services.annotation import (
+    available_comment_langs,
+    build_annotation_seq,
+    normalize_lang_code as _normalize_lang_code,
+    persist_comment,
+    perspective_for,
+    resolve_response_lang,
+    sanitize_comment,
+)
+from src.backend.services.llm_client import (
+    SSE_HEADERS,
+    LLMBusy,
+    LLMError,
+    open_stream as llm_open_stream,
+    sse_event,
+)
+from src.backend.services.annotation_jobs import enqueue_annotation, finish_job, job_langs, start_inline_job
 
 router = APIRouter(prefix="/api/match", tags=["match"])
 logger = logging.getLogger("soultribe.match")
@@ -28,32 +46,6 @@ logger = logging.getLogger("soultribe.match")
 # Cache settings (seconds)
 MATCH_SCORE_CACHE_TTL = 60 * 60  # 1 hour
 
-# Minimal display names for EU languages we support on the frontend; fallback to code
-LANG_DISPLAY = {
-    'en': 'English', 'de': 'German', 'fr': 'French', 'es': 'Spanish', 'it': 'Italian', 'pt': 'Portuguese',
-    'nl': 'Dutch', 'sv': 'Swedish', 'no': 'Norwegian', 'da': 'Danish', 'fi': 'Finnish', 'is': 'Icelandic',
-    'ga': 'Irish', 'cy': 'Welsh', 'mt': 'Maltese', 'lb': 'Luxembourgish', 'ca': 'Catalan', 'gl': 'Galician',
-    'eu': 'Basque', 'pl': 'Polish', 'cs': 'Czech', 'sk': 'Slovak', 'hu': 'Hungarian', 'ro': 'Romanian',
-    'bg': 'Bulgarian', 'hr': 'Croatian', 'sr': 'Serbian', 'sl': 'Slovene', 'mk': 'Macedonian', 'sq': 'Albanian',
-    'bs': 'Bosnian', 'et': 'Estonian', 'lv': 'Latvian', 'lt': 'Lithuanian', 'el': 'Greek', 'tr': 'Turkish',
-    'ru': 'Russian', 'uk': 'Ukrainian', 'be': 'Belarusian'
-}
-
-
-def _normalize_lang_code(value: Optional[str]) -> Optional[str]:
-    """Normalize language codes to a simple lowercase base form (e.g., 'de-AT' -> 'de')."""
-    if value is None:
-        return None
-    try:
-        raw = str(value).strip().lower()
-    except Exception:
-        return None
-    if not raw:
-        return None
-    base = raw.split('-')[0]
-    return base or raw
-
-
 def _ordered_unique_langs(*codes: Optional[str]) -> List[str]:
     seen: List[str] = []
     for code in codes:
@@ -178,7 +170,7 @@ class MatchScoreOut(BaseModel):
     breakdown: Dict[str, Any]
 
 
-@router.post("/score", response_model=MatchScoreOut, dependencies=[Depends(rate_limit("match:score", limit=20, window_seconds=60))])
+@router.post("/score", response_model=MatchScoreOut, dependencies=[Depends(rate_limit("match:score", limit=20, window_seconds=60, per_user=True))])
 def match_score(inp: MatchScoreIn) -> MatchScoreOut:
     # If either birth time is unknown, halve moon-related weights
     moon_half = not (inp.a_birth_time_known and inp.b_birth_time_known)
@@ -234,16 +226,199 @@ class MatchCandidateOut(BaseModel):
     primary_equal: Optional[bool] = None
 
 
-@router.post("/find", response_model=List[MatchCandidateOut], dependencies=[Depends(rate_limit("match:find", limit=10, window_seconds=60))])
-def match_find(
+def _rank_candidates(
     inp: MatchFindIn,
-    session=Depends(get_session),
+    target_radix: Radix,
+    target_profile: Optional[Profile],
+    radices: List[Radix],
+    profiles: Dict[int, Profile],
+    users: Dict[int, User],
+    overlaps_by_user: Dict[int, List[Dict[str, Any]]],
+    matches_by_other: Dict[int, Match],
+) -> List[MatchCandidateOut]:
+    """Score every candidate against the target user (CPU-bound, no database access)."""
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    def extract_langs(p: Profile | None) -> set[str]:
+        langs: set[str] = set()
+        if not p:
+            return langs
+        if getattr(p, "languages", None):
+            langs.update([s.strip().lower() for s in p.languages if isinstance(s, str)])
+        if p.lang_primary:
+            langs.add(p.lang_primary.strip().lower())
+        if p.lang_secondary:
+            langs.add(p.lang_secondary.strip().lower())
+        return langs
+
+    target_langs = extract_langs(target_profile)
+
+    viewer_langs = _viewer_lang_candidates(target_profile)
+    viewer_primary = viewer_langs[0] if viewer_langs else None
+    results: List[MatchCandidateOut] = []
+    for row in radices:
+        other_user_id = row.user_id
+        if other_user_id == inp.user_id:
+            continue
+        other_profile = profiles.get(other_user_id)
+        if other_profile is None:
+            continue
+        # Activity filter: include users unless they have a last_login_at older than cutoff.
+        # Do NOT exclude users with no last_login_at to avoid asymmetry in discovery.
+        ou = users.get(other_user_id)
+        if not ou:
+            continue
+        if not _is_bot_user(ou):
+            try:
+                if getattr(ou, 'last_login_at', None) is not None and ou.last_login_at < cutoff:
+                    continue
+            except Exception:
+                pass
+        # Language intersection enforcement
+        other_langs = extract_langs(other_profile)
+        if target_langs and other_langs and target_langs.isdisjoint(other_langs):
+            # No shared language → skip this candidate unless other user is a managed bot
+            if not _is_bot_user(ou):
+                continue
+        # Compute shared languages list for UI (stable order)
+        shared_list = sorted(list(target_langs.intersection(other_langs))) if (target_langs and other_langs) else []
+        # Determine moon_half_weight
+        a_known = bool(target_profile.birth_time_known) if target_profile else True
+        b_known = bool(other_profile.birth_time_known)
+        moon_half = not (a_known and b_known)
+        # Language flags for scoring bonus (original behavior):
+        # - Any language overlap counts as primary_equal for scoring
+        # - No separate secondary bonus
+        has_lang_overlap = bool(target_langs and other_langs and not target_langs.isdisjoint(other_langs))
+        lp_equal_for_scoring = has_lang_overlap
+        ls_equal_for_scoring = False
+        # For UI metadata only: primary_equal means exact equality of primary languages
+        lp_equal = bool(
+            target_profile and other_profile and 
+            getattr(target_profile, 'lang_primary', None) and getattr(other_profile, 'lang_primary', None) and 
+            str(target_profile.lang_primary).strip().lower() == str(other_profile.lang_primary).strip().lower()
+        )
+
+        cache_key = _pair_cache_key(
+            inp.user_id,
+            other_user_id,
+            moon_half,
+            lp_equal_for_scoring,
+            ls_equal_for_scoring,
+        )
+        cached_score = _score_from_cache(cache_key)
+        if cached_score:
+            score, breakdown = cached_score
+        else:
+            score, breakdown = score_pair(
+                target_radix.json,
+                row.json,
+                moon_half_weight=moon_half,
+                lang_primary_equal=bool(lp_equal_for_scoring),
+                lang_secondary_equal=bool(ls_equal_for_scoring),
+            )
+            _store_score_cache(cache_key, score, breakdown)
+        overlaps = overlaps_by_user.get(other_user_id, [])
+        # Add localized views (live_tz) for both users when possible
+        a_tz = getattr(target_profile, "live_tz", None)
+        b_tz = getattr(other_profile, "live_tz", None)
+        instants = [t for ov in overlaps for t in (ov["start_dt_utc"], ov["end_dt_utc"])]
+        local = localize_many(instants, (a_tz, b_tz)) if instants else {}
+        a_local = local.get(a_tz) if a_tz else None
+        b_local = local.get(b_tz) if b_tz else None
+        enhanced_overlaps: List[Dict[str, Any]] = []
+        for idx, ov in enumerate(overlaps):
+            item = dict(ov)
+            if a_local:
+                item["a_local_start"] = a_local[2 * idx]
+                item["a_local_end"] = a_local[2 * idx + 1]
+                item["a_tz"] = a_tz
+            if b_local:
+                item["b_local_start"] = b_local[2 * idx]
+                item["b_local_end"] = b_local[2 * idx + 1]
+                item["b_tz"] = b_tz
+            enhanced_overlaps.append(item)
+
+        # If a Match already exists between these users, include its comment
+        comment = None
+        comment_lang = None
+        has_other = False
+        mid = None
+        available_langs: List[str] = []
+        existing_match = matches_by_other.get(other_user_id)
+        if existing_match:
+            mid = existing_match.id
+            comment, comment_lang, available_langs = _pick_comment_for_viewer(existing_match, viewer_langs)
+            if comment_lang == 'und':
+                comment_lang = None
+            if available_langs:
+                # Offer alternate options if there are stored langs beyond the current one
+                if comment_lang:
+                    has_other = any(code != comment_lang for code in available_langs)
+                else:
+                    has_other = True
+            # Encourage regeneration when comment language differs from viewer preference
+            if viewer_primary and comment_lang and comment_lang != viewer_primary:
+                has_other = True
+            if viewer_primary and not comment_lang:
+                has_other = True
+
+        results.append(MatchCandidateOut(
+            user_id=other_user_id,
+            score=score,
+            breakdown=breakdown,
+            overlaps=enhanced_overlaps,
+            comment=comment,
+            comment_lang=comment_lang,
+            available_comment_langs=available_langs,
+            has_other_comment_langs=has_other,
+            match_id=mid,
+            other_display_name=getattr(other_profile, "display_name", None),
+            shared_languages=shared_list,
+            primary_equal=lp_equal,
+        ))
+
+    return results
+
+
+async def _matches_by_other(session, user_id: int) -> Dict[int, Match]:
+    """Existing matches of ``user_id``, keyed by the other user's id."""
+    try:
+        rows = (await session.exec(
+            select(Match).where((Match.a_user_id == user_id) | (Match.b_user_id == user_id))
+        )).all()
+    except Exception as ex:
+        if "comments_by_lang" not in str(ex):
+            raise
+        # Older schema without comments_by_lang: only the legacy comment is available
+        try:
+            await session.rollback()
+        except Exception:
+            pass
+        raw = (await session.exec(
+            text(
+                """
+                SELECT id, a_user_id, b_user_id, comment
+                FROM match
+                WHERE a_user_id = :user_id OR b_user_id = :user_id
+                """
+            ),
+            params={"user_id": user_id},
+        )).all()
+        rows = [Match(id=r.id, a_user_id=r.a_user_id, b_user_id=r.b_user_id, comment=r.comment) for r in raw]
+    return {(m.b_user_id if m.a_user_id == user_id else m.a_user_id): m for m in rows}
+
+
+@router.post("/find", response_model=List[MatchCandidateOut], dependencies=[Depends(rate_limit("match:find", limit=10, window_seconds=60, per_user=True))])
+async def match_find(
+    inp: MatchFindIn,
+    session=Depends(get_async_read_session),
     user_id: int = Depends(get_current_user_id),
     response: Response = None,
 ) -> List[MatchCandidateOut]:
     try:
         # Ensure user exists
-        user = session.get(User, inp.user_id)
+        user = await session.get(User, inp.user_id)
         if user is None:
             raise HTTPException(status_code=404, detail="User not found")
 
@@ -252,248 +427,38 @@ def match_find(
             raise HTTPException(status_code=403, detail="Email not verified")
 
         # Load target radix and profile
-        target_radix = session.get(Radix, inp.user_id)
-        target_profile = session.get(Profile, inp.user_id)
+        target_radix = await session.get(Radix, inp.user_id)
+        target_profile = await session.get(Profile, inp.user_id)
         if target_radix is None:
             raise HTTPException(status_code=400, detail="Target user has no radix computed yet")
 
-        # Iterate other users with radices
-        results: List[MatchCandidateOut] = []
         # naive scan: fetch all radices and profiles via ORM
-        from sqlmodel import select
-        radices = session.exec(select(Radix)).all()
+        radices = (await session.exec(select(Radix))).all()
         # Build a map user_id -> profile
-        profiles = {p.user_id: p for p in session.exec(select(Profile)).all()}
+        profiles = {p.user_id: p for p in (await session.exec(select(Profile))).all()}
         # Build a map user_id -> user (for activity filtering)
-        users = {u.id: u for u in session.exec(select(User)).all()}
-        cutoff = datetime.utcnow() - timedelta(days=30)
-
-        def extract_langs(p: Profile | None) -> set[str]:
-            langs: set[str] = set()
-            if not p:
-                return langs
-            if getattr(p, "languages", None):
-                langs.update([s.strip().lower() for s in p.languages if isinstance(s, str)])
-            if p.lang_primary:
-                langs.add(p.lang_primary.strip().lower())
-            if p.lang_secondary:
-                langs.add(p.lang_secondary.strip().lower())
-            return langs
-
-        target_langs = extract_langs(target_profile)
-
-        viewer_langs = _viewer_lang_candidates(target_profile)
-        viewer_primary = viewer_langs[0] if viewer_langs else None
-        for row in radices:
-            other_user_id = row.user_id
-            if other_user_id == inp.user_id:
-                continue
-            other_profile = profiles.get(other_user_id)
-            if other_profile is None:
-                continue
-            # Activity filter: include users unless they have a last_login_at older than cutoff.
-            # Do NOT exclude users with no last_login_at to avoid asymmetry in discovery.
-            ou = users.get(other_user_id)
-            if not ou:
-                continue
-            if not _is_bot_user(ou):
-                try:
-                    if getattr(ou, 'last_login_at', None) is not None and ou.last_login_at < cutoff:
-                        continue
-                except Exception:
-                    pass
-            # Language intersection enforcement
-            other_langs = extract_langs(other_profile)
-            if target_langs and other_langs and target_langs.isdisjoint(other_langs):
-                # No shared language → skip this candidate unless other user is a managed bot
-                if not _is_bot_user(ou):
-                    continue
-            # Compute shared languages list for UI (stable order)
-            shared_list = sorted(list(target_langs.intersection(other_langs))) if (target_langs and other_langs) else []
-            # Determine moon_half_weight
-            a_known = bool(target_profile.birth_time_known) if target_profile else True
-            b_known = bool(other_profile.birth_time_known)
-            moon_half = not (a_known and b_known)
-            # Language flags for scoring bonus (original behavior):
-            # - Any language overlap counts as primary_equal for scoring
-            # - No separate secondary bonus
-            has_lang_overlap = bool(target_langs and other_langs and not target_langs.isdisjoint(other_langs))
-            lp_equal_for_scoring = has_lang_overlap
-            ls_equal_for_scoring = False
-            # For UI metadata only: primary_equal means exact equality of primary languages
-            lp_equal = bool(
-                target_profile and other_profile and 
-                getattr(target_profile, 'lang_primary', None) and getattr(other_profile, 'lang_primary', None) and 
-                str(target_profile.lang_primary).strip().lower() == str(other_profile.lang_primary).strip().lower()
-            )
-
-            cache_key = _pair_cache_key(
-                inp.user_id,
-                other_user_id,
-                moon_half,
-                lp_equal_for_scoring,
-                ls_equal_for_scoring,
-            )
-            cached_score = _score_from_cache(cache_key)
-            if cached_score:
-                score, breakdown = cached_score
-            else:
-                score, breakdown = score_pair(
-                    target_radix.json,
-                    row.json,
-                    moon_half_weight=moon_half,
-                    lang_primary_equal=bool(lp_equal_for_scoring),
-                    lang_secondary_equal=bool(ls_equal_for_scoring),
-                )
-                _store_score_cache(cache_key, score, breakdown)
-            # Compute availability overlaps (prefer SQL tstzrange over Python for performance)
-            lookahead_days = int(inp.lookahead_days) if inp.lookahead_days is not None else 3
-            max_items = int(inp.max_overlaps) if inp.max_overlaps is not None else 5
-            overlaps: List[Dict[str, Any]] = []
-            try:
-                # Horizon and SQL overlap on availability_once
-                sql = text(
-                    """
-                    WITH horizon AS (
-                        SELECT now() AT TIME ZONE 'UTC' AS t0,
-                               (now() AT TIME ZONE 'UTC') + (:days || ' days')::interval AS t1
-                    ),
-                    ua AS (
-                        SELECT window_utc FROM availability_once WHERE user_id = :user_a
-                          AND window_utc && tstzrange((SELECT t0 FROM horizon), (SELECT t1 FROM horizon), '[)')
-                    ),
-                    ub AS (
-                        SELECT window_utc FROM availability_once WHERE user_id = :user_b
-                          AND window_utc && tstzrange((SELECT t0 FROM horizon), (SELECT t1 FROM horizon), '[)')
-                    )
-                    SELECT 
-                        GREATEST(lower(a.window_utc), lower(b.window_utc)) AS start_dt_utc,
-                        LEAST(upper(a.window_utc),  upper(b.window_utc))  AS end_dt_utc
-                    FROM ua a
-                    JOIN ub b ON a.window_utc && b.window_utc
-                    WHERE GREATEST(lower(a.window_utc), lower(b.window_utc)) < LEAST(upper(a.window_utc), upper(b.window_utc))
-                    ORDER BY 1
-                    LIMIT :lim
-                    """
-                )
-                rows = session.exec(sql, {"user_a": inp.user_id, "user_b": other_user_id, "days": lookahead_days, "lim": max_items}).all()
-                for r in rows:
-                    # r is a Row with start_dt_utc, end_dt_utc
-                    overlaps.append({
-                        "start_dt_utc": r.start_dt_utc,
-                        "end_dt_utc": r.end_dt_utc,
-                    })
-            except Exception as _ex:
-                # Fallback to Python implementation if availability_once is missing
-                from sqlmodel import select as _select
-                a_slots = session.exec(
-                    _select(AvailabilitySlot).where(AvailabilitySlot.user_id == inp.user_id)
-                ).all()
-                b_slots = session.exec(
-                    _select(AvailabilitySlot).where(AvailabilitySlot.user_id == other_user_id)
-                ).all()
-                a_pairs = [(s.start_dt_utc, s.end_dt_utc) for s in a_slots]
-                b_pairs = [(s.start_dt_utc, s.end_dt_utc) for s in b_slots]
-                overlaps = intersect_hourly_slots(
-                    a_pairs,
-                    b_pairs,
-                    lookahead_days=lookahead_days,
-                    max_items=max_items,
-                )
-            # Add localized views (live_tz) for both users when possible
-            a_tz = getattr(target_profile, "live_tz", None)
-            b_tz = getattr(other_profile, "live_tz", None)
-            enhanced_overlaps: List[Dict[str, Any]] = []
-            for ov in overlaps:
-                item = dict(ov)
-                if a_tz:
-                    try:
-                        z = ZoneInfo(a_tz)
-                        item["a_local_start"] = ov["start_dt_utc"].astimezone(z)
-                        item["a_local_end"] = ov["end_dt_utc"].astimezone(z)
-                        item["a_tz"] = a_tz
-                    except Exception:
-                        pass
-                if b_tz:
-                    try:
-                        z = ZoneInfo(b_tz)
-                        item["b_local_start"] = ov["start_dt_utc"].astimezone(z)
-                        item["b_local_end"] = ov["end_dt_utc"].astimezone(z)
-                        item["b_tz"] = b_tz
-                    except Exception:
-                        pass
-                enhanced_overlaps.append(item)
-
-            # If a Match already exists between these users, include its comment
-            from sqlmodel import select as _select
-            comment = None
-            comment_lang = None
-            has_other = False
-            mid = None
-            available_langs: List[str] = []
-            existing_match = None
-            try:
-                existing_match = session.exec(
-                    _select(Match).where(
-                        ((Match.a_user_id == inp.user_id) & (Match.b_user_id == other_user_id)) |
-                        ((Match.a_user_id == other_user_id) & (Match.b_user_id == inp.user_id))
-                    )
-                ).first()
-            except Exception as ex:
-                if "comments_by_lang" in str(ex):
-                    try:
-                        session.rollback()
-                    except Exception:
-                        pass
-                    raw = session.exec(
-                        text(
-                            """
-                            SELECT id, comment
-                            FROM match
-                            WHERE (a_user_id = :user_a AND b_user_id = :user_b)
-                               OR (a_user_id = :user_b AND b_user_id = :user_a)
-                            LIMIT 1
-                            """
-                        ),
-                        params={"user_a": inp.user_id, "user_b": other_user_id}
-                    ).first()
-                    if raw:
-                        mid = raw.id if hasattr(raw, "id") else raw[0]
-                        comment = raw.comment if hasattr(raw, "comment") else raw[1]
-                else:
-                    raise
-
-            if existing_match:
-                mid = existing_match.id
-                comment, comment_lang, available_langs = _pick_comment_for_viewer(existing_match, viewer_langs)
-                if comment_lang == 'und':
-                    comment_lang = None
-                if available_langs:
-                    # Offer alternate options if there are stored langs beyond the current one
-                    if comment_lang:
-                        has_other = any(code != comment_lang for code in available_langs)
-                    else:
-                        has_other = True
-                # Encourage regeneration when comment language differs from viewer preference
-                if viewer_primary and comment_lang and comment_lang != viewer_primary:
-                    has_other = True
-                if viewer_primary and not comment_lang:
-                    has_other = True
-
-            results.append(MatchCandidateOut(
-                user_id=other_user_id,
-                score=score,
-                breakdown=breakdown,
-                overlaps=enhanced_overlaps,
-                comment=comment,
-                comment_lang=comment_lang,
-                available_comment_langs=available_langs,
-                has_other_comment_langs=has_other,
-                match_id=mid,
-                other_display_name=getattr(other_profile, "display_name", None),
-                shared_languages=shared_list,
-                primary_equal=lp_equal,
-            ))
+        users = {u.id: u for u in (await session.exec(select(User))).all()}
+        # Availability overlaps against every candidate in one range-join query
+        overlaps_by_user = await session.run_sync(
+            find_overlaps,
+            inp.user_id,
+            lookahead_days=int(inp.lookahead_days) if inp.lookahead_days is not None else 3,
+            max_items=int(inp.max_overlaps) if inp.max_overlaps is not None else 5,
+        )
+        matches_by_other = await _matches_by_other(session, inp.user_id)
+
+        # Scoring is CPU-bound and reads the score cache synchronously; keep it off the event loop
+        results = await run_in_threadpool(
+            _rank_candidates,
+            inp,
+            target_radix,
+            target_profile,
+            radices,
+            profiles,
+            users,
+            overlaps_by_user,
+            matches_by_other,
+        )
 
         # Apply min_score if provided
         if inp.min_score is not None:
@@ -538,7 +503,7 @@ class MatchCreateOut(BaseModel):
     score: int
 
 
-@router.post("/create", response_model=MatchCreateOut, dependencies=[Depends(rate_limit("match:create", limit=5, window_seconds=60))])
+@router.post("/create", response_model=MatchCreateOut, dependencies=[Depends(rate_limit("match:create", limit=5, window_seconds=60, per_user=True))])
 def match_create(inp: MatchCreateIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)) -> MatchCreateOut:
     logger.info(
         "match_create: start a=%s b=%s actor=%s",
@@ -633,167 +598,180 @@ def match_create(inp: MatchCreateIn, session=Depends(get_session), user_id: int
 class MatchAnnotateIn(BaseModel):
     match_id: int
     lang: Optional[str] = None
+    # Generate these languages in the same job too (one batched prompt); /annotate only
+    langs: List[str] = Field(default_factory=list)
+    # Shorthand: add the other participant's primary language to ``langs``
+    pair: bool = False
 
 
-class MatchAnnotateOut(BaseModel):
+class MatchAnnotateJobOut(BaseModel):
+    job_id: int
     match_id: int
-    comment: str
     lang: str
+    langs: List[str] = Field(default_factory=list)
+    status: str  # queued | running | done | failed
+    comment: Optional[str] = None
+    error: Optional[str] = None
     available_comment_langs: List[str] = Field(default_factory=list)
 
 
-@router.post("/annotate", response_model=MatchAnnotateOut, dependencies=[Depends(rate_limit("match:annotate", limit=5, window_seconds=300))])
-def match_annotate(inp: MatchAnnotateIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)) -> MatchAnnotateOut:
+def _job_out(job: AnnotationJob, m: Optional[Match]) -> MatchAnnotateJobOut:
+    comment = None
+    if job.status == "done" and m is not None and isinstance(m.comments_by_lang, dict):
+        comment = m.comments_by_lang.get(job.lang)
+    return MatchAnnotateJobOut(
+        job_id=job.id,
+        match_id=job.match_id,
+        lang=job.lang,
+        langs=job_langs(job),
+        status=job.status,
+        comment=comment,
+        error=job.error if job.status == "failed" else None,
+        available_comment_langs=available_comment_langs(m) if m is not None else [],
+    )
+
+
+@router.post("/annotate", response_model=MatchAnnotateJobOut, status_code=202, dependencies=[Depends(rate_limit("match:annotate", limit=5, window_seconds=300, per_user=True))])
+def match_annotate(inp: MatchAnnotateIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)) -> MatchAnnotateJobOut:
+    """Queue AI comment generation; poll GET /api/match/annotate/{job_id} for the result.
+
+    Repeated requests for the same match, language and perspective while a job is
+    queued or running return that job instead of starting another generation.
+    With ``pair`` (or ``langs``) the job also fills in the other languages, so a
+    bilingual pair needs one generation instead of one per viewer language.
+    """
     m = session.get(Match, inp.match_id)
     if m is None:
         log_match_annotation(match=None, actor_user_id=user_id, success=False, metadata={"reason": "match_not_found", "match_id": inp.match_id})
         raise HTTPException(status_code=404, detail="Match not found")
 
-    # Build a compact sequence; instruct model to use 'you' and the other's display_name
-    pa = session.get(Profile, m.a_user_id)
-    pb = session.get(Profile, m.b_user_id)
-    other_id = m.b_user_id if user_id == m.a_user_id else m.a_user_id
-    other_prof = pb if user_id == m.a_user_id else pa
-    # Do not expose display_name to the AI prompt/output; use a generic label
-    other_name = (other_prof.display_name if (other_prof and other_prof.display_name) else f"user {other_id}")
-    public_other_label = "the other person"
-    perspective = "A" if user_id == m.a_user_id else "B"
-    # Determine viewer's preferred language for the AI response
-    viewer_prof = pa if perspective == "A" else pb
-    try:
-        # Order: request lang -> profile.lang_primary -> 'en'
-        raw = (inp.lang or getattr(viewer_prof, 'lang_primary', None) or 'en')
-        raw = str(raw).strip().lower()
-        base = raw.split('-')[0] if raw else 'en'
-        resp_lang = base if base else 'en'
-    except Exception:
-        resp_lang = 'en'
+    perspective = perspective_for(m, user_id)
+    viewer_prof = session.get(Profile, m.a_user_id if perspective == "A" else m.b_user_id)
+    resp_lang = _normalize_lang_code(resolve_response_lang(inp.lang, viewer_prof)) or "und"
     try:
         print("[match.annotate] target_lang=", resp_lang)
     except Exception:
         pass
-    # Derive top positive contributors from breakdown to give the AI more context
-    def top_positive_contributors(bd: dict, limit: int = 6) -> list[tuple[str,int]]:
-        contrib: list[tuple[str,int]] = []
-        try:
-            if not isinstance(bd, dict):
-                return contrib
-            # core
-            for k, v in (bd.get("core") or {}).items():
-                if isinstance(v, (int, float)) and v > 0 and k != "moon_factor":
-                    contrib.append((k, int(v)))
-            # secondary
-            for k, v in (bd.get("secondary") or {}).items():
-                if isinstance(v, (int, float)) and v > 0:
-                    contrib.append((k, int(v)))
-            # NOTE: exclude language-related points from AI prompt to focus on radix-only interpretation
-            # houses: collect bonus total and named items if any
-            houses = bd.get("houses") or {}
-            hb = houses.get("house_bonus_total")
-            if isinstance(hb, (int, float)) and hb > 0:
-                contrib.append(("houses", int(hb)))
-            # angles
-            for k, v in (bd.get("angles") or {}).items():
-                if isinstance(v, (int, float)) and v > 0:
-                    contrib.append((k, int(v)))
-        except Exception:
-            pass
-        # sort by points desc and keep top
-        contrib.sort(key=lambda x: x[1], reverse=True)
-        return contrib[:limit]
 
-    top_pos = top_positive_contributors(m.score_json or {})
-    # We will not send points or a heading to the AI; keep for potential future use only
-    pos_str = ""
+    extra = list(inp.langs)
+    if inp.pair:
+        other_prof = session.get(Profile, m.b_user_id if perspective == "A" else m.a_user_id)
+        extra.append(getattr(other_prof, "lang_primary", None))
+    # Languages already stored need no new generation; the requested one is always redone
+    have = set(available_comment_langs(m))
+    extra_langs = [code for code in (_normalize_lang_code(x) for x in extra) if code and code not in have]
+
+    job, created = enqueue_annotation(
+        session,
+        match_id=m.id,
+        lang=resp_lang,
+        perspective=perspective,
+        requested_by=user_id,
+        extra_langs=extra_langs,
+    )
+    if not created:
+        logger.info("match_annotate: coalesced onto job=%s match=%s lang=%s", job.id, m.id, resp_lang)
+    return _job_out(job, m)
 
-    # Build a breakdown copy without language section for the AI
-    bd_for_ai = dict(m.score_json or {})
-    try:
-        if isinstance(bd_for_ai, dict) and 'lang' in bd_for_ai:
-            bd_for_ai = {k: v for k, v in bd_for_ai.items() if k != 'lang'}
-    except Exception:
-        pass
 
-    lang_name = LANG_DISPLAY.get(resp_lang, resp_lang)
-    seq = [
-        f"RESPONSE LANGUAGE CODE: {resp_lang}",
-        f"Please respond ONLY in {lang_name} ({resp_lang}). Do not use any other language.",
-        f"Perspective: you are side {perspective}",
-        # Provide only the raw breakdown data (without language) to ground the analysis
-        f"Breakdown (languages removed): {json.dumps(bd_for_ai, ensure_ascii=False)}",
-        "Write a friendly, helpful interpretation based only on chart/radix aspects (core, houses, angles). Do not discuss languages. Do not mention scores, points, or the word 'match'. Do not include section headings or bullet lists; write continuous prose. Address 'you' and refer to the other simply as 'the other person'. Do not refer to A or B.",
-    ]
-
-    # Call Node wrapper that uses dev/ollama.js to get a comment
+@router.post("/annotate/stream", dependencies=[Depends(rate_limit("match:annotate", limit=5, window_seconds=300, per_user=True))])
+def match_annotate_stream(inp: MatchAnnotateIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
+    """Generate the comment inline and stream it as server-sent events.
+
+    Emits ``data: {"delta": ...}`` per model chunk. The text is stored once complete and
+    ``event: done`` carries the sanitized comment, which clients should display in place
+    of the streamed draft (A/B wording is only rewritten on the full text).
+
+    The generation is registered as a running annotation job, so it coalesces with
+    /annotate. When a job for the same match, language and perspective is already
+    queued or running, nothing is generated: the response is that job as JSON with
+    status 202, to be polled like /annotate.
+    """
+    m = session.get(Match, inp.match_id)
+    if m is None:
+        log_match_annotation(match=None, actor_user_id=user_id, success=False, metadata={"reason": "match_not_found", "match_id": inp.match_id})
+        raise HTTPException(status_code=404, detail="Match not found")
+
+    perspective = perspective_for(m, user_id)
+    viewer_prof = session.get(Profile, m.a_user_id if perspective == "A" else m.b_user_id)
+    resp_lang = _normalize_lang_code(resolve_response_lang(inp.lang, viewer_prof)) or "und"
+    match_id = m.id
+    job, created = start_inline_job(
+        session,
+        match_id=match_id,
+        lang=resp_lang,
+        perspective=perspective,
+        requested_by=user_id,
+    )
+    if not created:
+        logger.info("match_annotate_stream: coalesced onto job=%s match=%s lang=%s", job.id, match_id, resp_lang)
+        return JSONResponse(status_code=202, content=_job_out(job, m).model_dump())
+    job_id = job.id
+    seq = build_annotation_seq(m.score_json, perspective, resp_lang)
     try:
-        completed = subprocess.run(
-            ["node", "src/backend/services/llm/ollama_cli.mjs", json.dumps(seq)],
-            capture_output=True,
-            text=True,
-            cwd=".",
-            timeout=60,
+        first, rest = llm_open_stream(seq)
+    except LLMBusy as e:
+        finish_job(job_id, error=str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        finish_job(job_id, error=str(e))
+        log_match_annotation(match=m, actor_user_id=user_id, success=False, metadata={"error": str(e)})
+        raise HTTPException(status_code=502, detail=f"LLM error: {e}")
+
+    def events():
+        # Any exit before the comment is stored (LLM error, client gone) fails the job
+        error = "stream_aborted"
+        try:
+            parts = [first]
+            yield sse_event({"delta": first})
+            try:
+                for delta in rest:
+                    parts.append(delta)
+                    yield sse_event({"delta": delta})
+            except LLMError as e:
+                error = str(e)
+                yield sse_event({"detail": error}, event="error")
+                return
+            comment = sanitize_comment("".join(parts).strip(), perspective)
+            # The request session is gone once streaming starts; store in a fresh one
+            with session_scope() as s:
+                saved = persist_comment(s, match_id, resp_lang, comment)
+                if saved is None:
+                    error = "match_not_found"
+                    yield sse_event({"detail": "Match not found"}, event="error")
+                    return
+                stored_match, storage_lang, stored = saved
+                s.commit()
+                log_match_annotation(
+                    match=stored_match,
+                    actor_user_id=user_id,
+                    success=True,
+                    metadata={"lang": storage_lang, "available_langs": sorted(stored.keys()), "stream": True, "job_id": job_id},
+                )
+            error = None
+        finally:
+            finish_job(job_id, error=error)
+        yield sse_event(
+            {
+                "match_id": match_id,
+                "comment": comment,
+                "lang": storage_lang,
+                "available_comment_langs": sorted(c for c in stored if c != "und"),
+            },
+            event="done",
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to run ollama client: {e}")
-
-    if completed.returncode != 0:
-        err = completed.stderr.strip() or completed.stdout.strip()
-        log_match_annotation(match=m, actor_user_id=user_id, success=False, metadata={"error": err})
-        raise HTTPException(status_code=502, detail=f"ollama client error: {err}")
-
-    comment = (completed.stdout or "").strip()
-    # Post-process to enforce 'you' and other_name instead of A/B
-    def sanitize_comment(txt: str, perspective: str, other_name: str) -> str:
-        t = txt
-        # Replace common phrases first
-        t = re.sub(r"\bA and B\b", f"you and {other_name}", t)
-        t = re.sub(r"\bB and A\b", f"{other_name} and you", t)
-        # Strip explicit match id or points if present
-        t = re.sub(r"Match\s*#?\d+", "", t, flags=re.IGNORECASE)
-        t = re.sub(r"\b\d+\s*points\b", "", t, flags=re.IGNORECASE)
-        # Token-level replacements by perspective
-        if perspective == "A":
-            t = re.sub(r"\bA\b", "you", t)
-            t = re.sub(r"\bB\b", other_name, t)
-        else:
-            t = re.sub(r"\bB\b", "you", t)
-            t = re.sub(r"\bA\b", other_name, t)
-        return t
-    comment = sanitize_comment(comment, perspective, public_other_label)
-
-    # Store in DB (localized map + legacy field)
-    existing_map: Dict[str, str] = {}
-    if isinstance(m.comments_by_lang, dict):
-        for key, val in m.comments_by_lang.items():
-            norm_key = _normalize_lang_code(key)
-            if not norm_key:
-                continue
-            if isinstance(val, str) and val.strip():
-                existing_map[norm_key] = val.strip()
-    # Store under normalized language code, or 'und' if nothing usable
-    storage_lang = _normalize_lang_code(resp_lang) or 'und'
-    existing_map[storage_lang] = comment
-    m.comments_by_lang = existing_map
-
-    if storage_lang == 'en' or not m.comment:
-        m.comment = comment
-
-    session.add(m)
-    session.commit()
-
-    available_langs = sorted({code for code in existing_map.keys() if code != 'und'})
-
-    log_match_annotation(
-        match=m,
-        actor_user_id=user_id,
-        success=True,
-        metadata={
-            "lang": storage_lang,
-            "available_langs": list(sorted(existing_map.keys())),
-        },
-    )
 
-    return MatchAnnotateOut(match_id=m.id, comment=comment, lang=storage_lang, available_comment_langs=available_langs)
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/annotate/{job_id}", response_model=MatchAnnotateJobOut)
+def match_annotate_status(job_id: int, session=Depends(get_session), user_id: int = Depends(get_current_user_id)) -> MatchAnnotateJobOut:
+    job = session.get(AnnotationJob, job_id)
+    m = session.get(Match, job.match_id) if job is not None else None
+    # Only match participants may see a job; unknown and foreign jobs look the same
+    if job is None or m is None or user_id not in (m.a_user_id, m.b_user_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job, m)
 
 
 # Intentionally no manual comment editing endpoint; comments are generated by the AI via /api/match/annotate
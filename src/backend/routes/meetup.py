@@ -1,6 +1,5 @@
 from __future__ import annotations
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
 from typing import Optional
 
 import logging
@@ -8,27 +7,25 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlmodel import select
+from sqlalchemy import case
+from sqlalchemy.orm import aliased
 
-from src.backend.db import get_session
+from src.backend.db import get_async_read_session, get_session
 from src.backend.models import Match, Meetup, Profile, User
 from src.backend.services.jitsi import make_room_url
 from src.backend.services.jwt_auth import get_current_user_id
 from src.backend.services.rate_limit import rate_limit
 from src.backend.services.audit import log_meetup_event
 from src.backend.services.email import send_email
-from src.backend.services.email_templates import (
-    SUPPORTED_EMAIL_LANGS,
-    get_cancel_copy,
-    get_confirm_copy,
-    get_delete_copy,
-    get_propose_copy,
-    get_unconfirm_copy,
-)
+from src.backend.services.email_templates import SUPPORTED_EMAIL_LANGS, render_email
 from src.backend.services.activity_log import log_event
+from src.backend.services.timezones import localize
 
 router = APIRouter(prefix="/api/meetup", tags=["meetup"])
 logger = logging.getLogger("soultribe.meetup")
 
+DASHBOARD_URL = "https://soultribe.chat/login.html"
+
 
 def _normalize_lang(code: str | None) -> str | None:
     if not code:
@@ -56,7 +53,7 @@ class ProposeOut(BaseModel):
     status: str
 
 
-@router.post("/propose", response_model=ProposeOut, dependencies=[Depends(rate_limit("meetup:propose", limit=5, window_seconds=60))])
+@router.post("/propose", response_model=ProposeOut, dependencies=[Depends(rate_limit("meetup:propose", limit=5, window_seconds=60, per_user=True))])
 def propose(inp: ProposeIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
     m = session.get(Match, inp.match_id)
     if m is None:
@@ -86,7 +83,6 @@ def propose(inp: ProposeIn, session=Depends(get_session), user_id: int = Depends
 
     if other_user and other_user.email_verified_at:
         lang = _resolve_email_lang(other_profile)
-        copy = get_propose_copy(lang)
         proposed_time = "(time pending)"
         proposed_local = None
         other_tz_label = None
@@ -95,32 +91,20 @@ def propose(inp: ProposeIn, session=Depends(get_session), user_id: int = Depends
             proposed_time = proposed_dt_utc.strftime("%Y-%m-%d %H:%M UTC")
             other_tz = other_profile.live_tz if other_profile and other_profile.live_tz else None
             if other_tz:
-                try:
-                    proposed_local = proposed_dt_utc.astimezone(ZoneInfo(other_tz)).strftime("%Y-%m-%d %H:%M %Z")
+                local = localize((proposed_dt_utc,), other_tz)
+                if local:
+                    proposed_local = local[0].strftime("%Y-%m-%d %H:%M %Z")
                     other_tz_label = other_tz
-                except Exception:
-                    proposed_local = None
-        dashboard_url = "https://soultribe.chat/login.html"
-        subject = copy["subject"].format(proposer=proposer_name)
-        html_parts = [
-            f"<p>{copy['intro'].format(recipient=other_name)}</p>",
-            f"<p>{copy['body'].format(proposer=proposer_name)}</p>",
-            f"<p><strong>{copy['proposed_time_utc']}:</strong> {proposed_time}</p>",
-        ]
-        text_parts = [
-            f"{copy['intro'].format(recipient=other_name)}\n\n",
-            f"{copy['body'].format(proposer=proposer_name)}\n",
-            f"{copy['proposed_time_utc']}: {proposed_time}\n",
-        ]
-        if proposed_local and other_tz_label:
-            html_parts.append(f"<p><strong>{copy['proposed_time_local'].format(tz=other_tz_label)}:</strong> {proposed_local}</p>")
-            text_parts.append(f"{copy['proposed_time_local'].format(tz=other_tz_label)}: {proposed_local}\n")
-        html_parts.append(f"<p><a href=\"{dashboard_url}\">{copy['cta_html']}</a>.</p>")
-        text_parts.append(f"{copy['cta_text']}: {dashboard_url}")
-        html = ''.join(html_parts)
-        text = ''.join(text_parts)
+        msg = render_email("propose", lang, {
+            "recipient": other_name,
+            "proposer": proposer_name,
+            "time": proposed_time,
+            "local_time": proposed_local if other_tz_label else None,
+            "tz": other_tz_label,
+            "dashboard_url": DASHBOARD_URL,
+        })
         try:
-            send_email(other_user.email, subject, html, text)
+            send_email(other_user.email, msg.subject, msg.html, msg.text)
         except Exception as exc:  # pragma: no cover - best effort
             log_meetup_event(meetup=mm, actor_user_id=user_id, action="email_propose", success=False, metadata={"error": str(exc)})
 
@@ -148,7 +132,7 @@ class ConfirmOut(BaseModel):
     status: str
 
 
-@router.post("/confirm", response_model=ConfirmOut, dependencies=[Depends(rate_limit("meetup:confirm", limit=5, window_seconds=60))])
+@router.post("/confirm", response_model=ConfirmOut, dependencies=[Depends(rate_limit("meetup:confirm", limit=5, window_seconds=60, per_user=True))])
 def confirm(inp: ConfirmIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
     mm = session.get(Meetup, inp.meetup_id)
     if mm is None:
@@ -185,45 +169,19 @@ def confirm(inp: ConfirmIn, session=Depends(get_session), user_id: int = Depends
     proposer_name = proposer_profile.display_name if proposer_profile and proposer_profile.display_name else (proposer_user.email if proposer_user else "")
     confirmer_name = confirmer_profile.display_name if confirmer_profile and confirmer_profile.display_name else (confirmer_user.email if confirmer_user else "")
 
-    html_body = (
-        f"<p>{{confirm_html}}</p>"
-        f"<p>{{join_label}}: <a href=\"{url}\">{url}</a></p>"
-        f"<p>{{manage_hint}}</p>"
-    )
-    text_body = (
-        f"{{confirm_text}}\n"
-        f"{{join_label}}: {url}\n\n"
-        "{manage_hint}"
-    )
-
     for recipient, name, label in (
         (proposer_user, proposer_name or "there", "proposer"),
         (confirmer_user, confirmer_name or "there", "confirmer"),
     ):
         if recipient and recipient.email_verified_at:
             profile = proposer_profile if label == "proposer" else confirmer_profile
-            lang = _resolve_email_lang(profile)
-            copy = get_confirm_copy(lang)
-            subject = copy["subject"]
-            personalized_html = (
-                f"<p>{copy['intro_html'].format(recipient=name)}</p>"
-                + html_body.format(
-                    confirm_html=copy["meetup_confirmed_html"].format(time=confirmed_time),
-                    join_label=copy["join_label"],
-                    manage_hint=copy["manage_hint_html"],
-                    url=url,
-                )
-            )
-            personalized_text = (
-                f"{copy['intro_text'].format(recipient=name)}\n\n"
-                + text_body.format(
-                    confirm_text=copy["meetup_confirmed_text"].format(time=confirmed_time),
-                    join_label=copy["join_label"],
-                    manage_hint=copy["manage_hint_text"],
-                )
-            )
+            msg = render_email("confirm", _resolve_email_lang(profile), {
+                "recipient": name,
+                "time": confirmed_time,
+                "url": url,
+            })
             try:
-                send_email(recipient.email, subject, personalized_html, personalized_text)
+                send_email(recipient.email, msg.subject, msg.html, msg.text)
             except Exception as exc:  # pragma: no cover - best effort
                 log_meetup_event(meetup=mm, actor_user_id=user_id, action="email_confirm", success=False, metadata={"recipient": label, "error": str(exc)})
 
@@ -257,9 +215,9 @@ class MeetupItem(BaseModel):
     jitsi_url: str | None
 
 
-@router.get("/list", response_model=list[MeetupItem], dependencies=[Depends(rate_limit("meetup:list", limit=20, window_seconds=60))])
-def list_meetups(
-    session=Depends(get_session),
+@router.get("/list", response_model=list[MeetupItem], dependencies=[Depends(rate_limit("meetup:list", limit=20, window_seconds=60, per_user=True))])
+async def list_meetups(
+    session=Depends(get_async_read_session),
     user_id: int = Depends(get_current_user_id),
     limit: int = 50,
     offset: int = 0,
@@ -271,34 +229,44 @@ def list_meetups(
         offset,
     )
     try:
-        # Fetch meetups where the user is either a_user_id or b_user_id in the related match
-        from sqlmodel import select
+        # Fetch meetups where the user is either a_user_id or b_user_id in the related match,
+        # resolving all display names in the same query
+        other_id = case((Match.a_user_id == user_id, Match.b_user_id), else_=Match.a_user_id)
+        other_prof = aliased(Profile)
+        proposer_prof = aliased(Profile)
+        confirmer_prof = aliased(Profile)
         q = (
-            select(Meetup, Match)
+            select(
+                Meetup,
+                Match,
+                other_prof.display_name,
+                proposer_prof.display_name,
+                confirmer_prof.display_name,
+            )
             .join(Match, Match.id == Meetup.match_id)
+            .outerjoin(other_prof, other_prof.user_id == other_id)
+            .outerjoin(proposer_prof, proposer_prof.user_id == Meetup.proposer_user_id)
+            .outerjoin(confirmer_prof, confirmer_prof.user_id == Meetup.confirmer_user_id)
             .where((Match.a_user_id == user_id) | (Match.b_user_id == user_id))
             .order_by(Meetup.id.desc())
             .limit(max(1, min(200, limit)))
             .offset(max(0, offset))
         )
-        rows = session.exec(q).all()
+        rows = (await session.exec(q)).all()
 
         items: list[MeetupItem] = []
-        for mm, m in rows:
+        for mm, m, other_name, proposer_name, confirmer_name in rows:
             other = m.b_user_id if m.a_user_id == user_id else m.a_user_id
-            prof = session.get(Profile, other)
-            proposer_prof = session.get(Profile, mm.proposer_user_id) if mm.proposer_user_id else None
-            confirmer_prof = session.get(Profile, mm.confirmer_user_id) if mm.confirmer_user_id else None
             items.append(
                 MeetupItem(
                     meetup_id=mm.id,
                     match_id=mm.match_id,
                     other_user_id=other,
-                    other_display_name=(prof.display_name if prof else None),
+                    other_display_name=other_name,
                     proposer_user_id=mm.proposer_user_id,
                     confirmer_user_id=mm.confirmer_user_id,
-                    proposer_display_name=(proposer_prof.display_name if proposer_prof else None),
-                    confirmer_display_name=(confirmer_prof.display_name if confirmer_prof else None),
+                    proposer_display_name=proposer_name,
+                    confirmer_display_name=confirmer_name,
                     status=mm.status,
                     proposed_dt_utc=mm.proposed_dt_utc,
                     confirmed_dt_utc=mm.confirmed_dt_utc,
@@ -313,7 +281,7 @@ def list_meetups(
         return items
     except Exception as exc:
         try:
-            session.rollback()
+            await session.rollback()
         except Exception:
             pass
         logger.exception(
@@ -335,7 +303,7 @@ class SimpleMeetupOut(BaseModel):
     status: str
 
 
-@router.post("/unconfirm", response_model=SimpleMeetupOut, dependencies=[Depends(rate_limit("meetup:unconfirm", limit=5, window_seconds=60))])
+@router.post("/unconfirm", response_model=SimpleMeetupOut, dependencies=[Depends(rate_limit("meetup:unconfirm", limit=5, window_seconds=60, per_user=True))])
 def unconfirm(inp: SimpleMeetupIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
     mm = session.get(Meetup, inp.meetup_id)
     if mm is None:
@@ -382,34 +350,18 @@ def unconfirm(inp: SimpleMeetupIn, session=Depends(get_session), user_id: int =
             else (proposer_user.email if proposer_user else "there")
         )
         if proposer_user and proposer_user.email_verified_at:
-            lang = _resolve_email_lang(proposer_profile)
-            copy = get_unconfirm_copy(lang)
-            dashboard_url = "https://soultribe.chat/login.html"
             proposed_time = None
             if mm.proposed_dt_utc:
                 proposed_time = mm.proposed_dt_utc.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-
-            html_parts = [
-                f"<p>{copy['intro_html'].format(recipient=proposer_name)}</p>",
-                f"<p>{copy['body_html'].format(other=actor_name)}</p>",
-            ]
-            text_parts = [
-                f"{copy['intro_text'].format(recipient=proposer_name)}\n\n",
-                f"{copy['body_text'].format(other=actor_name)}\n",
-            ]
-            if proposed_time:
-                html_parts.append(f"<p><strong>{copy['time_label']}:</strong> {proposed_time}</p>")
-                text_parts.append(f"{copy['time_label']}: {proposed_time}\n")
-            html_parts.append(f"<p><a href=\"{dashboard_url}\">{copy['cta_html']}</a></p>")
-            text_parts.append(f"{copy['cta_text']}: {dashboard_url}")
+            msg = render_email("unconfirm", _resolve_email_lang(proposer_profile), {
+                "recipient": proposer_name,
+                "other": actor_name,
+                "time": proposed_time,
+                "dashboard_url": DASHBOARD_URL,
+            })
 
             try:
-                send_email(
-                    proposer_user.email,
-                    copy["subject"],
-                    "".join(html_parts),
-                    "".join(text_parts),
-                )
+                send_email(proposer_user.email, msg.subject, msg.html, msg.text)
                 log_meetup_event(
                     meetup=mm,
                     actor_user_id=user_id,
@@ -442,7 +394,7 @@ class DeleteOut(BaseModel):
     deleted: bool
 
 
-@router.delete("/{meetup_id}", response_model=DeleteOut, dependencies=[Depends(rate_limit("meetup:delete", limit=5, window_seconds=60))])
+@router.delete("/{meetup_id}", response_model=DeleteOut, dependencies=[Depends(rate_limit("meetup:delete", limit=5, window_seconds=60, per_user=True))])
 def delete_meetup(meetup_id: int, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
     mm = session.get(Meetup, meetup_id)
     if mm is None:
@@ -480,33 +432,18 @@ def delete_meetup(meetup_id: int, session=Depends(get_session), user_id: int = D
     session.commit()
 
     if other_user and other_user.email_verified_at:
-        lang = _resolve_email_lang(other_profile)
-        copy = get_delete_copy(lang)
-        dashboard_url = "https://soultribe.chat/login.html"
         time_source = confirmed_dt_utc or proposed_dt_utc
         time_label = None
         if time_source:
             time_label = time_source.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-        html_sections = [
-            f"<p>{copy['intro_html'].format(recipient=other_name)}</p>",
-            f"<p>{copy['body_html'].format(other=actor_name)}</p>",
-        ]
-        text_sections = [
-            f"{copy['intro_text'].format(recipient=other_name)}\n\n",
-            f"{copy['body_text'].format(other=actor_name)}\n",
-        ]
-        if time_label:
-            html_sections.append(f"<p><strong>{copy['time_label']}:</strong> {time_label}</p>")
-            text_sections.append(f"{copy['time_label']}: {time_label}\n")
-        html_sections.append(f"<p><a href=\"{dashboard_url}\">{copy['cta_html']}</a></p>")
-        text_sections.append(f"{copy['cta_text']}: {dashboard_url}")
+        msg = render_email("delete", _resolve_email_lang(other_profile), {
+            "recipient": other_name,
+            "other": actor_name,
+            "time": time_label,
+            "dashboard_url": DASHBOARD_URL,
+        })
         try:
-            send_email(
-                other_user.email,
-                copy["subject"],
-                "".join(html_sections),
-                "".join(text_sections),
-            )
+            send_email(other_user.email, msg.subject, msg.html, msg.text)
             log_meetup_event(meetup=mm, actor_user_id=user_id, action="email_delete", success=True, metadata={"recipient": other_user_id})
         except Exception as exc:  # pragma: no cover - best effort
             log_meetup_event(
@@ -528,7 +465,7 @@ def delete_meetup(meetup_id: int, session=Depends(get_session), user_id: int = D
     )
     return DeleteOut(deleted=True)
 
-@router.post("/cancel", response_model=SimpleMeetupOut, dependencies=[Depends(rate_limit("meetup:cancel", limit=5, window_seconds=60))])
+@router.post("/cancel", response_model=SimpleMeetupOut, dependencies=[Depends(rate_limit("meetup:cancel", limit=5, window_seconds=60, per_user=True))])
 def cancel(inp: SimpleMeetupIn, session=Depends(get_session), user_id: int = Depends(get_current_user_id)):
     mm = session.get(Meetup, inp.meetup_id)
     if mm is None:
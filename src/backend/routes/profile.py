@@ -2,41 +2,52 @@ from __future__ import annotations
 from datetime import timezone
 from zoneinfo import ZoneInfo
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 import traceback
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import subprocess, json
+import json
 from sqlmodel import select
 from sqlalchemy import delete, or_
 
-from src.backend.db import get_session
+from src.backend.db import async_session_scope, get_async_read_session, get_session
 from src.backend.models import (
     User,
     Profile,
     Radix,
     AvailabilitySlot,
+    AvailabilityRange,
     Match,
     RefreshToken,
     EmailVerificationToken,
     PasswordResetToken,
 )
 from src.backend.schemas import ProfileUpdateIn, ProfileOut
+from src.backend.services import geocache
 from src.backend.services.radix import compute_radix_json
 from src.backend.services.jwt_auth import get_current_user_id
 from src.backend.services.activity_log import log_event
+from src.backend.services.llm_client import (
+    SSE_HEADERS,
+    LLMBusy,
+    LLMError,
+    complete as llm_complete,
+    open_stream as llm_open_stream,
+    sse_event,
+)
 
 router = APIRouter(prefix="/api/profile", tags=["profile"])
 
 @router.get("/me")
-def get_me(user_id: int = Depends(get_current_user_id), session = Depends(get_session)):
+async def get_me(user_id: int = Depends(get_current_user_id), session = Depends(get_async_read_session)):
     """Lightweight auth check and basic profile snapshot for the current user.
     Returns minimal info and avoids 404 to keep UIs simple.
     """
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     # It's possible to have a valid token for a deleted user; handle gracefully
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    prof = session.get(Profile, user_id)
+    prof = await session.get(Profile, user_id)
     return {
         "user_id": user_id,
         "email": user.email,
@@ -46,19 +57,24 @@ def get_me(user_id: int = Depends(get_current_user_id), session = Depends(get_se
     }
 
 @router.get("", response_model=ProfileOut)
-def get_profile(user_id: int = Depends(get_current_user_id), session = Depends(get_session)):
+async def get_profile(user_id: int = Depends(get_current_user_id), session = Depends(get_async_read_session)):
     # Ensure user exists
-    if session.get(User, user_id) is None:
+    if await session.get(User, user_id) is None:
         raise HTTPException(status_code=404, detail="User not found")
-    prof = session.get(Profile, user_id)
+    prof = await session.get(Profile, user_id)
     if prof is None:
-        prof = Profile(user_id=user_id)
-        session.add(prof)
-        session.commit()
-        try:
-            session.refresh(prof)
-        except Exception:
-            pass
+        # Reads may come from a replica; create the missing row on the primary
+        async with async_session_scope() as primary:
+            prof = await primary.get(Profile, user_id)
+            if prof is None:
+                prof = Profile(user_id=user_id)
+                primary.add(prof)
+                await primary.commit()
+                try:
+                    await primary.refresh(prof)
+                except Exception:
+                    pass
+            primary.expunge(prof)
     # Compute local birth datetime label if possible
     birth_dt_local: Optional[str] = None
     try:
@@ -99,8 +115,7 @@ class InterpretOut(BaseModel):
     reply: str
 
 
-@router.post("/interpret", response_model=InterpretOut)
-def interpret_profile(payload: InterpretIn, user_id: int = Depends(get_current_user_id), session = Depends(get_session)):
+def _interpret_seq(payload: InterpretIn, user_id: int, session) -> List[str]:
     # Ensure radix exists
     r = session.get(Radix, user_id)
     p = session.get(Profile, user_id)
@@ -130,10 +145,6 @@ def interpret_profile(payload: InterpretIn, user_id: int = Depends(get_current_u
         'et': 'Estonian', 'ga': 'Irish', 'hr': 'Croatian', 'mt': 'Maltese'
     }
     lang_label = LANG_LABELS.get(target_lang, target_lang)
-    try:
-        // print("[interpret] target_lang=", target_lang, "label=", lang_label)
-    except Exception:
-        pass
     intro = [
         "You are an insightful but concise astrologer.",
         "Provide a short, friendly reading in plain language (2-4 sentences).",
@@ -161,24 +172,49 @@ def interpret_profile(payload: InterpretIn, user_id: int = Depends(get_current_u
         seq.append(f"User: {payload.message}")
     else:
         seq.append("User: Please give me a brief, friendly interpretation of my natal chart.")
+    return seq
+
 
+@router.post("/interpret", response_model=InterpretOut)
+def interpret_profile(payload: InterpretIn, user_id: int = Depends(get_current_user_id), session = Depends(get_session)):
+    seq = _interpret_seq(payload, user_id, session)
     try:
-        completed = subprocess.run(
-            ["node", "src/backend/services/llm/ollama_cli.mjs", json.dumps(seq)],
-            capture_output=True,
-            text=True,
-            cwd=".",
-            timeout=60,
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to run ollama client: {e}")
+        reply = llm_complete(seq)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=f"LLM error: {e}")
+    return InterpretOut(reply=reply)
 
-    if completed.returncode != 0:
-        err = (completed.stderr or completed.stdout or "").strip()
-        raise HTTPException(status_code=502, detail=f"ollama client error: {err}")
 
-    reply = (completed.stdout or "").strip()
-    return InterpretOut(reply=reply)
+@router.post("/interpret/stream")
+def interpret_profile_stream(payload: InterpretIn, user_id: int = Depends(get_current_user_id), session = Depends(get_session)):
+    """Server-sent events variant of /interpret.
+
+    Emits ``data: {"delta": ...}`` per chunk, then ``event: done`` with the full reply
+    (or ``event: error`` if the model fails mid-stream).
+    """
+    seq = _interpret_seq(payload, user_id, session)
+    try:
+        first, rest = llm_open_stream(seq)
+    except LLMBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LLMError as e:
+        raise HTTPException(status_code=502, detail=f"LLM error: {e}")
+
+    def events():
+        parts = [first]
+        yield sse_event({"delta": first})
+        try:
+            for delta in rest:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        except LLMError as e:
+            yield sse_event({"detail": str(e)}, event="error")
+            return
+        yield sse_event({"reply": "".join(parts).strip()}, event="done")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 class DeleteAccountOut(BaseModel):
@@ -204,6 +240,7 @@ def delete_account(user_id: int = Depends(get_current_user_id), session=Depends(
 
     # Remove related records explicitly to avoid dangling data
     session.exec(delete(AvailabilitySlot).where(AvailabilitySlot.user_id == user_id))
+    session.exec(delete(AvailabilityRange).where(AvailabilityRange.user_id == user_id))
     session.exec(delete(Radix).where(Radix.user_id == user_id))
     session.exec(delete(Profile).where(Profile.user_id == user_id))
     session.exec(delete(EmailVerificationToken).where(EmailVerificationToken.user_id == user_id))
@@ -229,6 +266,18 @@ def get_radix(user_id: int = Depends(get_current_user_id), session = Depends(get
     # `Radix.json` property maps to underlying `data` field and DB column "json"
     return r.json
 
+def _resolve_place(session, name: Optional[str], lat: Optional[float], lon: Optional[float], tz: Optional[str]):
+    """(lat, lon, tz) with gaps filled from the place cache; values the client sent win."""
+    if not name and (lat is None or lon is None):
+        return lat, lon, tz
+    geo = geocache.resolve(name, lat, lon, source="profile", session=session, store=True)
+    if geo is None:
+        return lat, lon, tz
+    if lat is None or lon is None:
+        lat, lon = geo.lat, geo.lon
+    return lat, lon, tz or geo.tz
+
+
 @router.put("", response_model=ProfileOut)
 def update_profile(
     payload: ProfileUpdateIn,
@@ -240,25 +289,19 @@ def update_profile(
         raise HTTPException(status_code=404, detail="User not found")
 
     # 2) Upsert profile
-    try:
-        # print("[profile.update] user_id=", user_id)
-        try:
-            # Avoid printing secrets; payload has no secrets
-            # print("[profile.update] payload:", {
-                k: getattr(payload, k)
-                for k in [
-                    'display_name','birth_dt','birth_time_known','birth_place_name','birth_lat','birth_lon','birth_tz','live_tz','lang_primary','lang_secondary','languages','house_system'
-                ]
-            })
-        except Exception:
-            pass
-    except Exception:
-        pass
     prof = session.get(Profile, user_id)
     if prof is None:
         prof = Profile(user_id=user_id)
         session.add(prof)
 
+    # Coordinates/zones missing from the request come from the place cache (GeoCache)
+    birth_lat, birth_lon, birth_tz = _resolve_place(
+        session, payload.birth_place_name, payload.birth_lat, payload.birth_lon, payload.birth_tz
+    )
+    live_lat, live_lon, live_tz = _resolve_place(
+        session, payload.live_place_name, payload.live_lat, payload.live_lon, payload.live_tz
+    )
+
     # Normalize birth_dt_utc with noon fallback when unknown
     birth_dt_utc = None
     if payload.birth_dt is not None:
@@ -267,39 +310,17 @@ def update_profile(
         if dt.tzinfo is None:
             tz = None
             try:
-                if payload.birth_tz:
-                    tz = ZoneInfo(payload.birth_tz)
+                if birth_tz:
+                    tz = ZoneInfo(birth_tz)
             except Exception:
                 tz = None
             if tz is not None:
                 dt = dt.replace(tzinfo=tz)
-                try:
-                    # print("[profile.update] interpret naive as local", {
-                        "naive": str(payload.birth_dt),
-                        "tz": payload.birth_tz,
-                        "utcoffset": str(dt.utcoffset()),
-                    })
-                except Exception:
-                    pass
             else:
                 # Fallback assumption: input already UTC
                 dt = dt.replace(tzinfo=timezone.utc)
-                try:
-                    # print("[profile.update] naive with no tz provided; assuming UTC", {
-                        "naive": str(payload.birth_dt)
-                    })
-                except Exception:
-                    pass
         # Convert to UTC
         dt_utc = dt.astimezone(timezone.utc)
-        try:
-            # print("[profile.update] computed birth_dt_utc", {
-                "local": str(dt),
-                "birth_tz": payload.birth_tz,
-                "utc": str(dt_utc)
-            })
-        except Exception:
-            pass
         if not payload.birth_time_known:
             dt_utc = dt_utc.replace(hour=12, minute=0, second=0, microsecond=0)
         birth_dt_utc = dt_utc
@@ -309,13 +330,13 @@ def update_profile(
     if birth_dt_utc is not None:        prof.birth_dt_utc = birth_dt_utc
     prof.birth_time_known = payload.birth_time_known if payload.birth_time_known is not None else prof.birth_time_known
     if payload.birth_place_name is not None: prof.birth_place_name = payload.birth_place_name
-    if payload.birth_lat is not None:       prof.birth_lat = payload.birth_lat
-    if payload.birth_lon is not None:       prof.birth_lon = payload.birth_lon
-    if payload.birth_tz is not None:        prof.birth_tz = payload.birth_tz
+    if birth_lat is not None:               prof.birth_lat = birth_lat
+    if birth_lon is not None:               prof.birth_lon = birth_lon
+    if birth_tz is not None:                prof.birth_tz = birth_tz
     if payload.live_place_name is not None: prof.live_place_name = payload.live_place_name
-    if payload.live_lat is not None:        prof.live_lat = payload.live_lat
-    if payload.live_lon is not None:        prof.live_lon = payload.live_lon
-    if payload.live_tz is not None:         prof.live_tz = payload.live_tz
+    if live_lat is not None:                prof.live_lat = live_lat
+    if live_lon is not None:                prof.live_lon = live_lon
+    if live_tz is not None:                 prof.live_tz = live_tz
     if payload.lang_primary is not None:    prof.lang_primary = payload.lang_primary
     if payload.lang_secondary is not None:  prof.lang_secondary = payload.lang_secondary
     if payload.languages is not None:       prof.languages = payload.languages
@@ -328,13 +349,6 @@ def update_profile(
     # 3) Recompute radix if we have enough data (birth_dt_utc exists)
     if prof.birth_dt_utc is not None:
         try:
-            # print("[profile.update] recomputing radix…", {
-                "birth_dt_utc": str(prof.birth_dt_utc),
-                "birth_time_known": prof.birth_time_known,
-                "lat": prof.birth_lat,
-                "lon": prof.birth_lon,
-                "house_system": prof.house_system,
-            })
             rjson = compute_radix_json(
                 birth_dt_utc=prof.birth_dt_utc,
                 birth_time_known=prof.birth_time_known,
@@ -1,47 +1,65 @@
 from __future__ import annotations
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from timezonefinder import TimezoneFinder
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from src.backend.services import geocache
+from src.backend.services.rate_limit import rate_limit
+from src.backend.services.timezones import zones_at
 
 router = APIRouter(prefix="/api", tags=["timezone"])
 
-_tf = TimezoneFinder(in_memory=True)
+# Upper bound for points resolved by one batch request
+MAX_BATCH_POINTS = 1000
 
 class TZIn(BaseModel):
     lat: float
     lon: float
+    # Geocoder label of the picked place; lets repeat lookups come from the place cache
+    place_name: Optional[str] = None
 
 class TZOut(BaseModel):
     time_zone: str
 
-@router.post("/timezone", response_model=TZOut)
+@router.post("/timezone", response_model=TZOut, dependencies=[Depends(rate_limit("timezone", limit=30, window_seconds=60))])
 def get_timezone(payload: TZIn):
     try:
-        tz = _tf.timezone_at(lat=payload.lat, lng=payload.lon)
-        if not tz:
-            # Try nearest if direct lookup failed (e.g., in sea)
-            tz = _tf.closest_timezone_at(lat=payload.lat, lng=payload.lon)
+        # Place cache first (read-only: this route is unauthenticated), then the
+        # per-coordinate lookup cache (overrides from TZ_OVERRIDES)
+        entry = geocache.resolve(payload.place_name, payload.lat, payload.lon, source="timezone")
+        tz = entry.tz if entry else None
         if not tz:
             raise HTTPException(status_code=404, detail="Timezone not found for coordinates")
-        
-        # Manual corrections for common misidentified cities
-        lat, lon = payload.lat, payload.lon
-        
-        # Vienna area (Austria) - often misidentified as Paris
-        if 48.0 <= lat <= 48.5 and 16.0 <= lon <= 16.8:
-            tz = "Europe/Vienna"
-        # Berlin area (Germany)
-        elif 52.3 <= lat <= 52.7 and 13.0 <= lon <= 13.8:
-            tz = "Europe/Berlin"
-        # Zurich area (Switzerland)
-        elif 47.2 <= lat <= 47.5 and 8.3 <= lon <= 8.8:
-            tz = "Europe/Zurich"
-        # Prague area (Czech Republic)
-        elif 50.0 <= lat <= 50.2 and 14.2 <= lon <= 14.7:
-            tz = "Europe/Prague"
-        
         return TZOut(time_zone=tz)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+class TZPoint(BaseModel):
+    lat: float = Field(ge=-90, le=90)
+    lon: float = Field(ge=-180, le=180)
+
+
+class TZBatchIn(BaseModel):
+    points: List[TZPoint] = Field(max_length=MAX_BATCH_POINTS)
+
+
+class TZBatchOut(BaseModel):
+    # Same order as the request; null where no zone could be determined
+    time_zones: List[Optional[str]]
+
+
+@router.post("/timezone/batch", response_model=TZBatchOut, dependencies=[Depends(rate_limit("timezone:batch", limit=30, window_seconds=60))])
+def get_timezones(payload: TZBatchIn):
+    """Resolve many coordinates in one request (bulk profile imports, scripts).
+
+    Identical or nearby points (same rounded coordinate) are looked up once and
+    share the lookup cache with ``POST /api/timezone``.
+    """
+    try:
+        return TZBatchOut(time_zones=zones_at((p.lat, p.lon) for p in payload.points))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,183 @@
+"""AI match comments: prompt building, post-processing and storage.
+
+Shared by the annotate endpoints and the annotation job worker.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Dict, List, Optional
+
+from src.backend.models import Match, Profile
+
+# Minimal display names for EU languages we support on the frontend; fallback to code
+LANG_DISPLAY = {
+    'en': 'English', 'de': 'German', 'fr': 'French', 'es': 'Spanish', 'it': 'Italian', 'pt': 'Portuguese',
+    'nl': 'Dutch', 'sv': 'Swedish', 'no': 'Norwegian', 'da': 'Danish', 'fi': 'Finnish', 'is': 'Icelandic',
+    'ga': 'Irish', 'cy': 'Welsh', 'mt': 'Maltese', 'lb': 'Luxembourgish', 'ca': 'Catalan', 'gl': 'Galician',
+    'eu': 'Basque', 'pl': 'Polish', 'cs': 'Czech', 'sk': 'Slovak', 'hu': 'Hungarian', 'ro': 'Romanian',
+    'bg': 'Bulgarian', 'hr': 'Croatian', 'sr': 'Serbian', 'sl': 'Slovene', 'mk': 'Macedonian', 'sq': 'Albanian',
+    'bs': 'Bosnian', 'et': 'Estonian', 'lv': 'Latvian', 'lt': 'Lithuanian', 'el': 'Greek', 'tr': 'Turkish',
+    'ru': 'Russian', 'uk': 'Ukrainian', 'be': 'Belarusian'
+}
+
+# Do not expose display_name to the AI prompt/output; use a generic label
+PUBLIC_OTHER_LABEL = "the other person"
+
+
+def normalize_lang_code(value: Optional[str]) -> Optional[str]:
+    """Normalize language codes to a simple lowercase base form (e.g., 'de-AT' -> 'de')."""
+    if value is None:
+        return None
+    try:
+        raw = str(value).strip().lower()
+    except Exception:
+        return None
+    if not raw:
+        return None
+    base = raw.split('-')[0]
+    return base or raw
+
+
+def perspective_for(m: Match, viewer_user_id: int) -> str:
+    return "A" if viewer_user_id == m.a_user_id else "B"
+
+
+def resolve_response_lang(requested: Optional[str], viewer_profile: Optional[Profile]) -> str:
+    # Order: request lang -> profile.lang_primary -> 'en'
+    try:
+        raw = (requested or getattr(viewer_profile, 'lang_primary', None) or 'en')
+        raw = str(raw).strip().lower()
+        base = raw.split('-')[0] if raw else 'en'
+        return base if base else 'en'
+    except Exception:
+        return 'en'
+
+
+def build_annotation_seq(score_json: Optional[dict], perspective: str, resp_lang: str) -> List[str]:
+    # Build a breakdown copy without language section for the AI
+    bd_for_ai = dict(score_json or {})
+    try:
+        if isinstance(bd_for_ai, dict) and 'lang' in bd_for_ai:
+            bd_for_ai = {k: v for k, v in bd_for_ai.items() if k != 'lang'}
+    except Exception:
+        pass
+
+    lang_name = LANG_DISPLAY.get(resp_lang, resp_lang)
+    return [
+        f"RESPONSE LANGUAGE CODE: {resp_lang}",
+        f"Please respond ONLY in {lang_name} ({resp_lang}). Do not use any other language.",
+        f"Perspective: you are side {perspective}",
+        # Provide only the raw breakdown data (without language) to ground the analysis
+        f"Breakdown (languages removed): {json.dumps(bd_for_ai, ensure_ascii=False)}",
+        "Write a friendly, helpful interpretation based only on chart/radix aspects (core, houses, angles). Do not discuss languages. Do not mention scores, points, or the word 'match'. Do not include section headings or bullet lists; write continuous prose. Address 'you' and refer to the other simply as 'the other person'. Do not refer to A or B.",
+    ]
+
+
+def sanitize_comment(txt: str, perspective: str, other_name: str = PUBLIC_OTHER_LABEL) -> str:
+    """Enforce 'you' and the other's label instead of A/B in model output."""
+    t = txt
+    # Replace common phrases first
+    t = re.sub(r"\bA and B\b", f"you and {other_name}", t)
+    t = re.sub(r"\bB and A\b", f"{other_name} and you", t)
+    # Strip explicit match id or points if present
+    t = re.sub(r"Match\s*#?\d+", "", t, flags=re.IGNORECASE)
+    t = re.sub(r"\b\d+\s*points\b", "", t, flags=re.IGNORECASE)
+    # Token-level replacements by perspective
+    if perspective == "A":
+        t = re.sub(r"\bA\b", "you", t)
+        t = re.sub(r"\bB\b", other_name, t)
+    else:
+        t = re.sub(r"\bB\b", "you", t)
+        t = re.sub(r"\bA\b", other_name, t)
+    return t
+
+
+def store_comment(m: Match, resp_lang: str, comment: str) -> tuple[str, Dict[str, str]]:
+    """Put ``comment`` into ``m.comments_by_lang`` (and the legacy field); caller commits.
+
+    Returns (storage language, normalized comment map).
+    """
+    existing_map: Dict[str, str] = {}
+    if isinstance(m.comments_by_lang, dict):
+        for key, val in m.comments_by_lang.items():
+            norm_key = normalize_lang_code(key)
+            if not norm_key:
+                continue
+            if isinstance(val, str) and val.strip():
+                existing_map[norm_key] = val.strip()
+    # Store under normalized language code, or 'und' if nothing usable
+    storage_lang = normalize_lang_code(resp_lang) or 'und'
+    existing_map[storage_lang] = comment
+    m.comments_by_lang = existing_map
+
+    if storage_lang == 'en' or not m.comment:
+        m.comment = comment
+    return storage_lang, existing_map
+
+
+def available_comment_langs(m: Match) -> List[str]:
+    if not isinstance(m.comments_by_lang, dict):
+        return []
+    codes = {normalize_lang_code(k) for k, v in m.comments_by_lang.items() if isinstance(v, str) and v.strip()}
+    return sorted(c for c in codes if c and c != 'und')
+
+
+def persist_comment(session, match_id: int, resp_lang: str, comment: str) -> Optional[tuple[Match, str, Dict[str, str]]]:
+    """Store ``comment`` on the match under a row lock; caller commits.
+
+    The lock keeps concurrent generations for other languages from dropping each
+    other's entry in ``comments_by_lang``. Returns None when the match is gone.
+    """
+    saved = persist_comments(session, match_id, {resp_lang: comment})
+    if saved is None:
+        return None
+    m, storage_langs, stored = saved
+    return m, storage_langs[0], stored
+
+
+def persist_comments(session, match_id: int, comments: Dict[str, str]) -> Optional[tuple[Match, List[str], Dict[str, str]]]:
+    """Multi-language :func:`persist_comment`: one row lock for all entries.
+
+    Returns (match, storage languages in input order, comment map) or None.
+    """
+    m = session.get(Match, match_id, with_for_update=True)
+    if m is None:
+        return None
+    storage_langs: List[str] = []
+    stored: Dict[str, str] = {}
+    for lang, comment in comments.items():
+        storage_lang, stored = store_comment(m, lang, comment)
+        storage_langs.append(storage_lang)
+    session.add(m)
+    return m, storage_langs, stored
+
+
+_LANG_MARKER = re.compile(r"^\s*\[\[\s*([A-Za-z]{2,3})\s*\]\]\s*$", re.MULTILINE)
+
+
+def build_multilang_annotation_seq(score_json: Optional[dict], perspective: str, langs: List[str]) -> List[str]:
+    """One prompt asking for the same interpretation in every language of ``langs``."""
+    base = build_annotation_seq(score_json, perspective, langs[0])
+    listed = ", ".join(f"{LANG_DISPLAY.get(code, code)} ({code})" for code in langs)
+    markers = " ".join(f"[[{code}]]" for code in langs)
+    return [
+        f"RESPONSE LANGUAGE CODES: {', '.join(langs)}",
+        f"Write the text below once in each of these languages: {listed}.",
+        f"Start each version with a line containing only its marker, in this order: {markers}. Write nothing before the first marker.",
+        *base[2:],
+    ]
+
+
+def split_multilang_reply(reply: str, langs: List[str]) -> Dict[str, str]:
+    """Split a marker-delimited multi-language reply; languages without usable text are omitted."""
+    wanted = set(langs)
+    out: Dict[str, str] = {}
+    found = list(_LANG_MARKER.finditer(reply))
+    for i, marker in enumerate(found):
+        code = marker.group(1).lower()
+        end = found[i + 1].start() if i + 1 < len(found) else len(reply)
+        text = reply[marker.end():end].strip()
+        if code in wanted and text and code not in out:
+            out[code] = text
+    return out
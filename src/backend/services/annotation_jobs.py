@@ -0,0 +1,387 @@
+"""Annotation job queue: the annotate endpoint enqueues, this worker generates.
+
+Run as ``python -m src.backend.services.annotation_jobs`` (see soultribe-annotate.service).
+Jobs are claimed with SKIP LOCKED, so several worker processes can share the table.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from src.backend.db import session_scope
+from src.backend.models import AnnotationJob, Match
+from src.backend.services.annotation import (
+    build_annotation_seq,
+    build_multilang_annotation_seq,
+    persist_comments,
+    sanitize_comment,
+    split_multilang_reply,
+)
+from src.backend.services.audit import log_match_annotation
+from src.backend.services.llm_client import LLMBusy, LLMError, complete as llm_complete
+
+logger = logging.getLogger("soultribe.annotate")
+
+WORKER_THREADS = int(os.getenv("ANNOTATE_WORKER_THREADS", "2"))
+POLL_SECONDS = float(os.getenv("ANNOTATE_WORKER_POLL_SECONDS", "1"))
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 15
+BACKOFF_MAX_SECONDS = 600
+# Delay before a job that found every local LLM slot busy is picked up again
+BUSY_RETRY_SECONDS = 5
+# A running job older than this is assumed orphaned by a dead worker and re-claimed
+STALE_AFTER = timedelta(minutes=10)
+
+ACTIVE_STATUSES = ("queued", "running")
+# Upper bound on languages generated by one job (one batched prompt)
+MAX_JOB_LANGS = 3
+
+
+def _active_job(session, match_id: int, lang: str, perspective: str) -> Optional[AnnotationJob]:
+    return session.exec(
+        select(AnnotationJob).where(
+            AnnotationJob.match_id == match_id,
+            AnnotationJob.lang == lang,
+            AnnotationJob.perspective == perspective,
+            AnnotationJob.status.in_(ACTIVE_STATUSES),
+        )
+    ).first()
+
+
+def job_langs(job: AnnotationJob) -> List[str]:
+    return list(job.langs or [job.lang])
+
+
+def _covering_job(session, match_id: int, langs: List[str], perspective: str) -> Optional[AnnotationJob]:
+    """A live job that already generates every language in ``langs``."""
+    live = session.exec(
+        select(AnnotationJob).where(
+            AnnotationJob.match_id == match_id,
+            AnnotationJob.perspective == perspective,
+            AnnotationJob.status.in_(ACTIVE_STATUSES),
+        )
+    ).all()
+    for job in live:
+        if set(langs) <= set(job_langs(job)):
+            return job
+    return None
+
+
+def _extend_queued_job(session, job_id: int, langs: List[str]) -> List[str]:
+    """Add ``langs`` to a live job that has not been claimed yet; returns what did not fit.
+
+    The row is locked, so a worker cannot claim it between the check and the update
+    (claims skip locked rows). A job already running keeps its languages.
+    """
+    job = session.exec(
+        select(AnnotationJob)
+        .where(AnnotationJob.id == job_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).first()
+    if job is None:
+        session.rollback()
+        return list(langs)
+    have = job_langs(job)
+    missing = [code for code in langs if code not in have]
+    if job.status == "queued":
+        room = max(0, MAX_JOB_LANGS - len(have))
+        added, missing = missing[:room], missing[room:]
+        if added:
+            job.langs = have + added
+            session.add(job)
+    session.commit()
+    return missing
+
+
+def enqueue_annotation(
+    session,
+    *,
+    match_id: int,
+    lang: str,
+    perspective: str,
+    requested_by: int,
+    extra_langs: Optional[List[str]] = None,
+) -> tuple[AnnotationJob, bool]:
+    """Queue a comment generation, or return the live job for the same key.
+
+    ``extra_langs`` are generated by the same job in one batched prompt. When a live
+    job for ``lang`` lacks some of them, they are added to it while it is still
+    queued, or else queued as a separate job. Returns (job, created).
+    """
+    langs = [lang]
+    for code in extra_langs or []:
+        if code and code not in langs and len(langs) < MAX_JOB_LANGS:
+            langs.append(code)
+    existing = _covering_job(session, match_id, langs, perspective)
+    if existing is not None:
+        return existing, False
+    existing = _active_job(session, match_id, lang, perspective)
+    if existing is None:
+        job = AnnotationJob(
+            match_id=match_id,
+            lang=lang,
+            langs=langs if len(langs) > 1 else None,
+            perspective=perspective,
+            requested_by=requested_by,
+        )
+        session.add(job)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Lost the race against a concurrent request; the unique index kept one job
+            session.rollback()
+            existing = _active_job(session, match_id, lang, perspective)
+            if existing is None:
+                raise
+        else:
+            session.refresh(job)
+            return job, True
+    existing_id = existing.id
+    missing = _extend_queued_job(session, existing_id, langs)
+    if missing:
+        enqueue_annotation(
+            session,
+            match_id=match_id,
+            lang=missing[0],
+            perspective=perspective,
+            requested_by=requested_by,
+            extra_langs=missing[1:],
+        )
+    return session.get(AnnotationJob, existing_id), False
+
+
+def start_inline_job(
+    session,
+    *,
+    match_id: int,
+    lang: str,
+    perspective: str,
+    requested_by: int,
+) -> tuple[AnnotationJob, bool]:
+    """Register a generation the caller runs itself (the streaming endpoint).
+
+    The job is inserted as ``running``, so it holds the same live slot as a queued
+    job: later /annotate requests coalesce onto it and workers leave it alone. When
+    a live job already covers ``lang`` that job is returned instead. Returns
+    (job, created); the caller reports the outcome with ``finish_job``.
+    """
+    existing = _covering_job(session, match_id, [lang], perspective)
+    if existing is not None:
+        return existing, False
+    job = AnnotationJob(
+        match_id=match_id,
+        lang=lang,
+        perspective=perspective,
+        requested_by=requested_by,
+        status="running",
+        attempts=1,
+        started_at=datetime.utcnow(),
+    )
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        existing = _active_job(session, match_id, lang, perspective)
+        if existing is None:
+            raise
+        return existing, False
+    session.refresh(job)
+    return job, True
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _claim(session) -> Optional[AnnotationJob]:
+    while True:
+        now = datetime.utcnow()
+        job = session.exec(
+            select(AnnotationJob)
+            .where(
+                or_(
+                    (AnnotationJob.status == "queued") & (AnnotationJob.next_attempt_at <= now),
+                    (AnnotationJob.status == "running") & (AnnotationJob.started_at < now - STALE_AFTER),
+                )
+            )
+            .order_by(AnnotationJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            return None
+        if job.status == "running" and job.attempts >= MAX_ATTEMPTS:
+            # Its worker died on every attempt; stop re-claiming it
+            job.status = "failed"
+            job.error = "worker_lost"
+            job.finished_at = now
+            session.add(job)
+            session.commit()
+            logger.warning("annotate: job=%s failed after %s attempts", job.id, job.attempts)
+            continue
+        break
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+    job.attempts += 1
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def _requeue_busy(job_id: int, error: str) -> None:
+    """Put a job back without spending an attempt: a full local LLM queue is not a job failure."""
+    with session_scope() as session:
+        job = session.get(AnnotationJob, job_id)
+        if job is None:
+            return
+        job.status = "queued"
+        job.attempts = max(0, job.attempts - 1)
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=BUSY_RETRY_SECONDS)
+        job.error = error
+        session.add(job)
+        session.commit()
+
+
+def _finish(job_id: int, *, error: Optional[str] = None, retry: bool = False) -> None:
+    with session_scope() as session:
+        job = session.get(AnnotationJob, job_id)
+        if job is None:
+            return
+        if error is None:
+            job.status = "done"
+        elif retry and job.attempts < MAX_ATTEMPTS:
+            job.status = "queued"
+            job.next_attempt_at = datetime.utcnow() + _backoff(job.attempts)
+        else:
+            job.status = "failed"
+        job.error = error
+        job.finished_at = datetime.utcnow() if job.status in ("done", "failed") else None
+        session.add(job)
+        session.commit()
+
+
+def finish_job(job_id: int, *, error: Optional[str] = None) -> None:
+    """Mark a job started with ``start_inline_job`` done, or failed with ``error``."""
+    _finish(job_id, error=error)
+
+
+def _generate(score_json: Optional[dict], perspective: str, langs: List[str]) -> Dict[str, str]:
+    """Comments for ``langs``, keyed by language, first language first.
+
+    Several languages share one batched prompt; any language the model left out of
+    the batched reply is generated on its own. Only a failure for the first
+    (requested) language fails the job.
+    """
+    replies: Dict[str, str] = {}
+    if len(langs) > 1:
+        replies = split_multilang_reply(llm_complete(build_multilang_annotation_seq(score_json, perspective, langs)), langs)
+    comments: Dict[str, str] = {}
+    for i, lang in enumerate(langs):
+        reply = replies.get(lang)
+        if reply is None:
+            try:
+                reply = llm_complete(build_annotation_seq(score_json, perspective, lang))
+            except LLMError as exc:
+                if i == 0:
+                    raise
+                logger.warning("annotate: extra lang=%s skipped: %s", lang, exc)
+                continue
+        comments[lang] = sanitize_comment(reply, perspective)
+    return comments
+
+
+def process_one() -> bool:
+    """Claim and run a single job; returns False when the queue is empty."""
+    with session_scope() as session:
+        job = _claim(session)
+        if job is None:
+            return False
+        job_id, match_id = job.id, job.match_id
+        perspective, langs, actor = job.perspective, job_langs(job), job.requested_by
+        m = session.get(Match, match_id)
+        score_json = m.score_json if m is not None else None
+    if m is None:
+        _finish(job_id, error="match_not_found")
+        return True
+
+    # The LLM calls run outside any transaction; they can take tens of seconds
+    try:
+        comments = _generate(score_json, perspective, langs)
+    except LLMBusy as exc:
+        _requeue_busy(job_id, str(exc))
+        return True
+    except LLMError as exc:
+        logger.warning("annotate: job=%s failed: %s", job_id, exc)
+        _finish(job_id, error=str(exc), retry=True)
+        return True
+
+    with session_scope() as session:
+        saved = persist_comments(session, match_id, comments)
+        job = session.get(AnnotationJob, job_id)
+        if saved is None or job is None:
+            session.rollback()
+            _finish(job_id, error="match_not_found")
+            return True
+        m, storage_langs, stored = saved
+        job.status = "done"
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        session.add(job)
+        session.commit()
+        log_match_annotation(
+            match=m,
+            actor_user_id=actor,
+            success=True,
+            metadata={"lang": storage_langs[0], "langs": storage_langs, "available_langs": sorted(stored.keys()), "job_id": job_id},
+        )
+    return True
+
+
+def _loop(stop: threading.Event, once: bool) -> None:
+    while not stop.is_set():
+        try:
+            worked = process_one()
+        except Exception:
+            logger.exception("annotate: worker iteration failed")
+            worked = False
+        if once and not worked:
+            return
+        if not worked:
+            stop.wait(POLL_SECONDS)
+
+
+def run_worker(*, threads: int = WORKER_THREADS, once: bool = False) -> None:
+    stop = threading.Event()
+    workers = [threading.Thread(target=_loop, args=(stop, once), daemon=True) for _ in range(max(1, threads))]
+    for t in workers:
+        t.start()
+    try:
+        for t in workers:
+            while t.is_alive():
+                t.join(timeout=1.0)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Generate queued AI match comments.")
+    p.add_argument("--threads", type=int, default=WORKER_THREADS, help="Concurrent jobs (default: ANNOTATE_WORKER_THREADS or 2)")
+    p.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    run_worker(threads=args.threads, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
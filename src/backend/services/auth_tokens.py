@@ -6,6 +6,7 @@ import secrets
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
+from sqlalchemy import update
 from sqlmodel import Session, select
 
 from src.backend.models import RefreshToken, User
@@ -57,16 +58,22 @@ def revoke_refresh_token(session: Session, record: RefreshToken) -> None:
 
 
 def purge_old_refresh_tokens(session: Session, user: User) -> None:
-    tokens = session.exec(
-        select(RefreshToken)
+    # Revoke any live tokens beyond the most recent MAX entries, in one statement
+    newest = (
+        select(RefreshToken.id)
         .where(RefreshToken.user_id == user.id)
-        .order_by(RefreshToken.created_at.desc())
-    ).all()
-    if len(tokens) <= MAX_REFRESH_TOKENS_PER_USER:
-        return
-    # Revoke any excess tokens beyond the most recent MAX entries
-    for record in tokens[MAX_REFRESH_TOKENS_PER_USER:]:
-        revoke_refresh_token(session, record)
+        .order_by(RefreshToken.created_at.desc(), RefreshToken.id.desc())
+        .limit(MAX_REFRESH_TOKENS_PER_USER)
+    )
+    session.exec(
+        update(RefreshToken)
+        .where(
+            RefreshToken.user_id == user.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.id.not_in(newest),
+        )
+        .values(revoked_at=_utcnow_naive())
+    )
 
 
 def is_refresh_token_active(record: RefreshToken) -> bool:
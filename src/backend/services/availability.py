@@ -1,9 +1,8 @@
 from __future__ import annotations
-from datetime import datetime, timedelta, timezone
-from typing import Iterable, List, Tuple, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any
 
-# Slot is (start_dt_utc, end_dt_utc) both timezone-aware UTC datetimes
-Slot = Tuple[datetime, datetime]
+from sqlalchemy import text
 
 
 def _normalize_utc(dt: datetime) -> datetime:
@@ -12,73 +11,106 @@ def _normalize_utc(dt: datetime) -> datetime:
     return dt.astimezone(timezone.utc)
 
 
-def _align_to_hour(dt: datetime, *, up: bool) -> datetime:
-    dt = _normalize_utc(dt)
-    if up:
-        if dt.minute or dt.second or dt.microsecond:
-            dt = dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-        else:
-            dt = dt.replace(minute=0, second=0, microsecond=0)
-    else:
-        dt = dt.replace(minute=0, second=0, microsecond=0)
-    return dt
+# Rewrites one user's merged ranges from their slots. Gaps-and-islands instead of
+# range_agg so it runs on any Postgres: a slot starts a new run when it begins after
+# every earlier slot has ended; touching slots ([) ranges) stay in the same run.
+_REFRESH_RANGES_SQL = (
+    text("SELECT pg_advisory_xact_lock(hashtext('availabilityrange'), :user_id)"),
+    text("DELETE FROM availabilityrange WHERE user_id = :user_id"),
+    text(
+        """
+        INSERT INTO availabilityrange (user_id, start_dt_utc, end_dt_utc)
+        SELECT :user_id, min(start_dt_utc), max(end_dt_utc)
+        FROM (
+            SELECT start_dt_utc, end_dt_utc,
+                   sum(starts_run::int) OVER (ORDER BY start_dt_utc, end_dt_utc) AS run
+            FROM (
+                SELECT start_dt_utc, end_dt_utc,
+                       start_dt_utc > coalesce(
+                           max(end_dt_utc) OVER (
+                               ORDER BY start_dt_utc, end_dt_utc
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                           ),
+                           '-infinity'
+                       ) AS starts_run
+                FROM availabilityslot
+                WHERE user_id = :user_id AND end_dt_utc > start_dt_utc
+            ) s
+        ) r
+        GROUP BY run
+        """
+    ),
+)
 
 
-def intersect_hourly_slots(
-    slots_a: Iterable[Slot],
-    slots_b: Iterable[Slot],
-    *,
-    lookahead_days: int = 3,
-    max_items: int = 5,
-) -> List[Dict[str, Any]]:
-    now = datetime.now(timezone.utc)
-    horizon = now + timedelta(days=lookahead_days)
+def refresh_user_ranges(session, user_id: int) -> None:
+    """Rebuild ``availabilityrange`` for ``user_id`` from their slots (caller commits).
+
+    Call after every insert, update or delete of that user's slots, in the same
+    transaction. Pending ORM changes are flushed first; concurrent refreshes for the
+    same user are serialized by a transaction-scoped advisory lock.
+    """
+    session.flush()
+    for stmt in _REFRESH_RANGES_SQL:
+        session.exec(stmt, params={"user_id": user_id})
 
-    # Normalize and clip to [now, horizon]
-    def norm_clip(slots: Iterable[Slot]) -> List[Slot]:
-        out: List[Slot] = []
-        for s, e in slots:
-            s = _normalize_utc(s)
-            e = _normalize_utc(e)
-            if e <= s:
-                continue
-            # clip to [now, horizon]
-            if e <= now or s >= horizon:
-                continue
-            s = max(s, now)
-            e = min(e, horizon)
-            out.append((s, e))
-        return sorted(out, key=lambda x: x[0])
 
-    A = norm_clip(slots_a)
-    B = norm_clip(slots_b)
+# Joins the merged ranges directly: contiguous 1-hour slots are already one row on
+# both sides, so nothing is aggregated at query time.
+_OVERLAPS_SQL = text(
+    """
+    WITH horizon AS (
+        SELECT tstzrange(now(), now() + make_interval(days => :days), '[)') AS h
+    ),
+    mine AS (
+        SELECT r.window_utc * hz.h AS w
+        FROM availabilityrange r, horizon hz
+        WHERE r.user_id = :user_id
+          AND r.window_utc && hz.h
+    ),
+    aligned AS (
+        -- Round the intersection inwards to whole UTC hours
+        SELECT
+            t.user_id AS other_user_id,
+            date_trunc('hour', lower(m.w * t.window_utc) + interval '1 hour' - interval '1 microsecond', 'UTC') AS start_dt_utc,
+            date_trunc('hour', upper(m.w * t.window_utc), 'UTC') AS end_dt_utc
+        FROM mine m
+        JOIN availabilityrange t ON t.window_utc && m.w AND t.user_id <> :user_id
+    ),
+    ranked AS (
+        SELECT other_user_id, start_dt_utc, end_dt_utc,
+               row_number() OVER (PARTITION BY other_user_id ORDER BY start_dt_utc) AS rn
+        FROM aligned
+        WHERE end_dt_utc - start_dt_utc >= interval '1 hour'
+    )
+    SELECT other_user_id, start_dt_utc, end_dt_utc
+    FROM ranked
+    WHERE rn <= :max_items
+    ORDER BY other_user_id, start_dt_utc
+    """
+)
 
-    i = j = 0
-    results: List[Dict[str, Any]] = []
-    one_hour = timedelta(hours=1)
 
-    while i < len(A) and j < len(B) and len(results) < max_items:
-        a_s, a_e = A[i]
-        b_s, b_e = B[j]
-        start = max(a_s, b_s)
-        end = min(a_e, b_e)
-        if end > start:
-            # Align to whole-hour boundaries and enforce >= 1 hour
-            start_aligned = _align_to_hour(start, up=True)
-            end_aligned = _align_to_hour(end, up=False)
-            if end_aligned - start_aligned >= one_hour:
-                # If duration is more than 1h but not exact multiple, trim end to multiple of 1h
-                duration = end_aligned - start_aligned
-                hours = int(duration.total_seconds() // 3600)
-                trimmed_end = start_aligned + timedelta(hours=hours)
-                results.append({
-                    "start_dt_utc": start_aligned,
-                    "end_dt_utc": trimmed_end,
-                })
-        # Advance the pointer with the earlier end
-        if a_e <= b_e:
-            i += 1
-        else:
-            j += 1
+def find_overlaps(
+    session,
+    user_id: int,
+    *,
+    lookahead_days: int = 3,
+    max_items: int = 5,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """Hour-aligned overlaps between ``user_id`` and every other user, keyed by other user id.
 
-    return results
+    Runs a single range-join over ``availabilityrange.window_utc`` (GiST indexed), clipped to
+    ``[now, now + lookahead_days)`` and limited to ``max_items`` windows per other user.
+    """
+    rows = session.exec(
+        _OVERLAPS_SQL,
+        params={"user_id": user_id, "days": lookahead_days, "max_items": max_items},
+    ).all()
+    out: Dict[int, List[Dict[str, Any]]] = {}
+    for r in rows:
+        out.setdefault(r.other_user_id, []).append({
+            "start_dt_utc": _normalize_utc(r.start_dt_utc),
+            "end_dt_utc": _normalize_utc(r.end_dt_utc),
+        })
+    return out
@@ -7,6 +7,7 @@ from zoneinfo import ZoneInfo
 from sqlmodel import select
 
 from src.backend.models import User, Profile, AvailabilitySlot
+from src.backend.services.availability import refresh_user_ranges
 
 BOT_EMAIL_PATTERN = "gen%@soultribe.chat"
 
@@ -49,6 +50,7 @@ def _create_slot_for_profile(session, profile: Profile) -> bool:
         timezone=tz.key,
     )
     session.add(slot)
+    refresh_user_ranges(session, profile.user_id)
     return True
 
 
@@ -10,6 +10,9 @@ DEV_MODE = os.getenv("EMAIL_DEV_MODE", "0") == "1"
 SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
 EMAIL_FROM = os.getenv("EMAIL_FROM", "noreply@soultribe.chat")
+# When enabled, send_email only queues into the emailoutbox table and the
+# worker (python -m src.backend.services.email_outbox) delivers
+EMAIL_OUTBOX = os.getenv("EMAIL_OUTBOX", "1") == "1"
 
 
 def _log_email(to: str, subject: str, html: str, text: Optional[str] = None) -> None:
@@ -20,15 +23,7 @@ def _log_email(to: str, subject: str, html: str, text: Optional[str] = None) ->
     print("[email.dev] HTML:\n" + html, file=sys.stdout)
 
 
-def send_email(to: str, subject: str, html: str, text: Optional[str] = None) -> None:
-    """Send an email using localhost SMTP, mirroring docs/mail.md behavior.
-    Falls back to logging when EMAIL_DEV_MODE=1.
-    """
-    if DEV_MODE:
-        _log_email(to, subject, html, text)
-        return
-
-    # Build the email
+def build_message(to: str, subject: str, html: str, text: Optional[str] = None) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = EMAIL_FROM
     msg["To"] = to
@@ -45,7 +40,43 @@ def send_email(to: str, subject: str, html: str, text: Optional[str] = None) ->
             plain = ""
     msg.set_content(plain or "")
     msg.add_alternative(html, subtype="html")
+    return msg
+
 
+def deliver_email(to: str, subject: str, html: str, text: Optional[str] = None) -> None:
+    """Send one message right now over a fresh SMTP connection (no queue)."""
+    if DEV_MODE:
+        _log_email(to, subject, html, text)
+        return
     # Send via localhost SMTP (no TLS/auth per docs)
     with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as smtp:
-        smtp.send_message(msg)
+        smtp.send_message(build_message(to, subject, html, text))
+
+
+def enqueue_email(to: str, subject: str, html: str, text: Optional[str] = None, *, session=None) -> None:
+    """Queue a message in the outbox.
+
+    With ``session`` the row joins the caller's transaction (sent only if it commits);
+    otherwise it is written in its own short transaction.
+    """
+    from src.backend.models import EmailOutbox
+
+    row = EmailOutbox(to_addr=to, subject=subject, html=html, text=text)
+    if session is not None:
+        session.add(row)
+        return
+    from src.backend.db import session_scope
+
+    with session_scope() as own:
+        own.add(row)
+        own.commit()
+
+
+def send_email(to: str, subject: str, html: str, text: Optional[str] = None) -> None:
+    """Send an email using localhost SMTP, mirroring docs/mail.md behavior.
+    Queued in the outbox unless EMAIL_OUTBOX=0; logged when EMAIL_DEV_MODE=1.
+    """
+    if DEV_MODE or not EMAIL_OUTBOX:
+        deliver_email(to, subject, html, text)
+        return
+    enqueue_email(to, subject, html, text)
@@ -0,0 +1,149 @@
+"""Outbox worker: drains the emailoutbox table over one long-lived SMTP connection.
+
+Run as ``python -m src.backend.services.email_outbox`` (see soultribe-email.service).
+Several workers may run side by side; batches are claimed with SKIP LOCKED.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import smtplib
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlmodel import select
+
+from src.backend.db import session_scope
+from src.backend.models import EmailOutbox
+from src.backend.services.email import SMTP_HOST, SMTP_PORT, build_message
+
+logger = logging.getLogger("soultribe.email")
+
+BATCH_SIZE = int(os.getenv("EMAIL_WORKER_BATCH", "50"))
+POLL_SECONDS = float(os.getenv("EMAIL_WORKER_POLL_SECONDS", "2"))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "8"))
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 6 * 3600
+# Close the SMTP connection after this long without traffic; most MTAs drop idle clients
+SMTP_IDLE_SECONDS = 60
+
+
+class SmtpConnection:
+    """Lazily opened SMTP connection that is reused across messages."""
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT) -> None:
+        self.host = host
+        self.port = port
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _open(self) -> smtplib.SMTP:
+        self._smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        return self._smtp
+
+    def send(self, msg) -> None:
+        smtp = self._smtp or self._open()
+        try:
+            smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server closed the idle connection; retry once on a fresh one
+            self.close()
+            self._open().send_message(msg)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used > SMTP_IDLE_SECONDS:
+            self.close()
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def _is_permanent(exc: Exception) -> bool:
+    # 5xx replies (bad recipient, policy rejection) will not succeed on retry
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(exc, "smtp_code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+def drain_once(conn: SmtpConnection, *, batch_size: int = BATCH_SIZE) -> int:
+    """Send one batch of due messages; returns how many rows were attempted."""
+    now = datetime.utcnow()
+    with session_scope() as session:
+        rows = session.exec(
+            select(EmailOutbox)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        attempted = 0
+        for row in rows:
+            attempted += 1
+            row.attempts += 1
+            connection_lost = False
+            try:
+                conn.send(build_message(row.to_addr, row.subject, row.html, row.text))
+            except Exception as exc:
+                row.last_error = str(exc)[:500]
+                if _is_permanent(exc) or row.attempts >= MAX_ATTEMPTS:
+                    row.status = "failed"
+                    logger.warning("email.outbox: giving up id=%s to=%s error=%s", row.id, row.to_addr, exc)
+                else:
+                    row.next_attempt_at = datetime.utcnow() + _backoff(row.attempts)
+                    logger.info("email.outbox: retry id=%s attempt=%s error=%s", row.id, row.attempts, exc)
+                connection_lost = not _is_permanent(exc)
+            else:
+                row.status = "sent"
+                row.sent_at = datetime.utcnow()
+                row.last_error = None
+            session.add(row)
+            if connection_lost:
+                # Connection-level trouble: leave the rest of the batch for the next pass
+                conn.close()
+                break
+        session.commit()
+        return attempted
+
+
+def run_worker(*, once: bool = False) -> None:
+    conn = SmtpConnection()
+    try:
+        while True:
+            try:
+                processed = drain_once(conn)
+            except Exception:
+                logger.exception("email.outbox: drain failed")
+                processed = 0
+            if once:
+                return
+            if processed < BATCH_SIZE:
+                conn.close_if_idle()
+                time.sleep(POLL_SECONDS)
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Deliver queued emails from the emailoutbox table.")
+    p.add_argument("--once", action="store_true", help="Process a single batch and exit")
+    args = p.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    run_worker(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
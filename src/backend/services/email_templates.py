@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict
+from functools import lru_cache
+from html import escape
+from string import Formatter
+from typing import Callable, Dict, FrozenSet, Iterable, List, Literal, Mapping, NamedTuple, Optional, Tuple, TypedDict, overload
 
 
 SUPPORTED_EMAIL_LANGS = {
@@ -829,3 +832,179 @@ def get_cancel_copy(lang: str) -> Dict[str, str]:
 
 def get_delete_copy(lang: str) -> Dict[str, str]:
     return _DELETE_COPY.get(lang, _DELETE_COPY["en"])
+
+
+# --------------------- Compiled rendering ---------------------
+#
+# Each (kind, lang) layout is flattened once into a single subject/HTML/text format
+# string per combination of optional sections, so rendering a message is three
+# format_map calls. Slot values are HTML-escaped for the HTML variant only.
+
+
+class _ProposeRequired(TypedDict):
+    recipient: str
+    proposer: str
+    time: str
+    dashboard_url: str
+
+
+class ProposeSlots(_ProposeRequired, total=False):
+    local_time: Optional[str]  # optional section, needs tz as well
+    tz: Optional[str]
+
+
+class ConfirmSlots(TypedDict):
+    recipient: str
+    time: str
+    url: str
+
+
+class _NoticeRequired(TypedDict):
+    recipient: str
+    other: str
+    dashboard_url: str
+
+
+class NoticeSlots(_NoticeRequired, total=False):
+    # unconfirm / cancel / delete
+    time: Optional[str]  # optional section
+
+
+NoticeKind = Literal["unconfirm", "cancel", "delete"]
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html: str
+    text: str
+
+
+class _Section(NamedTuple):
+    html: str
+    text: str
+    when: Optional[str] = None  # slot that must be set for the section to render
+
+
+def _propose_layout(c: Dict[str, str]) -> Tuple[str, Tuple[_Section, ...]]:
+    return c["subject"], (
+        _Section(f"<p>{c['intro']}</p>", f"{c['intro']}\n\n"),
+        _Section(f"<p>{c['body']}</p>", f"{c['body']}\n"),
+        _Section(
+            f"<p><strong>{c['proposed_time_utc']}:</strong> {{time}}</p>",
+            f"{c['proposed_time_utc']}: {{time}}\n",
+        ),
+        _Section(
+            f"<p><strong>{c['proposed_time_local']}:</strong> {{local_time}}</p>",
+            f"{c['proposed_time_local']}: {{local_time}}\n",
+            when="local_time",
+        ),
+        _Section(
+            f"<p><a href=\"{{dashboard_url}}\">{c['cta_html']}</a>.</p>",
+            f"{c['cta_text']}: {{dashboard_url}}",
+        ),
+    )
+
+
+def _confirm_layout(c: Dict[str, str]) -> Tuple[str, Tuple[_Section, ...]]:
+    return c["subject"], (
+        _Section(f"<p>{c['intro_html']}</p>", f"{c['intro_text']}\n\n"),
+        _Section(f"<p>{c['meetup_confirmed_html']}</p>", f"{c['meetup_confirmed_text']}\n"),
+        _Section(
+            f"<p>{c['join_label']}: <a href=\"{{url}}\">{{url}}</a></p>",
+            f"{c['join_label']}: {{url}}\n\n",
+        ),
+        _Section(f"<p>{c['manage_hint_html']}</p>", c["manage_hint_text"]),
+    )
+
+
+def _notice_layout(c: Dict[str, str]) -> Tuple[str, Tuple[_Section, ...]]:
+    return c["subject"], (
+        _Section(f"<p>{c['intro_html']}</p>", f"{c['intro_text']}\n\n"),
+        _Section(f"<p>{c['body_html']}</p>", f"{c['body_text']}\n"),
+        _Section(
+            f"<p><strong>{c['time_label']}:</strong> {{time}}</p>",
+            f"{c['time_label']}: {{time}}\n",
+            when="time",
+        ),
+        _Section(
+            f"<p><a href=\"{{dashboard_url}}\">{c['cta_html']}</a></p>",
+            f"{c['cta_text']}: {{dashboard_url}}",
+        ),
+    )
+
+
+_LAYOUTS: Dict[str, Tuple[Callable[[str], Dict[str, str]], Callable[[Dict[str, str]], Tuple[str, Tuple[_Section, ...]]]]] = {
+    "propose": (get_propose_copy, _propose_layout),
+    "confirm": (get_confirm_copy, _confirm_layout),
+    "unconfirm": (get_unconfirm_copy, _notice_layout),
+    "cancel": (get_cancel_copy, _notice_layout),
+    "delete": (get_delete_copy, _notice_layout),
+}
+
+
+# Slots that gate a section; only these take part in the compile cache key
+_OPTIONAL_SLOTS = ("local_time", "time")
+
+
+def _fields(fmt: str) -> FrozenSet[str]:
+    return frozenset(name for _, name, _, _ in Formatter().parse(fmt) if name)
+
+
+@lru_cache(maxsize=None)
+def _compile(kind: str, lang: str, present: frozenset) -> Tuple[str, str, str, FrozenSet[str]]:
+    """(subject, html, text) format strings plus the slots they need."""
+    get_copy, layout = _LAYOUTS[kind]
+    subject, sections = layout(get_copy(lang))
+    chosen = [sec for sec in sections if sec.when is None or sec.when in present]
+    html_fmt = "".join(sec.html for sec in chosen)
+    text_fmt = "".join(sec.text for sec in chosen)
+    return subject, html_fmt, text_fmt, _fields(subject) | _fields(html_fmt) | _fields(text_fmt)
+
+
+@overload
+def render_email(kind: Literal["propose"], lang: str, slots: ProposeSlots) -> RenderedEmail: ...
+
+
+@overload
+def render_email(kind: Literal["confirm"], lang: str, slots: ConfirmSlots) -> RenderedEmail: ...
+
+
+@overload
+def render_email(kind: NoticeKind, lang: str, slots: NoticeSlots) -> RenderedEmail: ...
+
+
+def render_email(kind: str, lang: str, slots: Mapping[str, Optional[str]]) -> RenderedEmail:
+    """Render subject, HTML and text for one recipient from the compiled template.
+
+    ``kind`` is one of propose/confirm/unconfirm/cancel/delete; optional sections are
+    dropped when their slot is empty. Unknown languages fall back to English. Raises
+    ``ValueError`` naming any slot the template needs but ``slots`` leaves unset.
+    """
+    present = frozenset(k for k in _OPTIONAL_SLOTS if slots.get(k))
+    subject, html_fmt, text_fmt, required = _compile(kind, lang if lang in SUPPORTED_EMAIL_LANGS else "en", present)
+    missing = sorted(name for name in required if slots.get(name) is None)
+    if missing:
+        raise ValueError(f"{kind} email is missing slots: {', '.join(missing)}")
+    html_slots = {k: escape(str(v)) if v is not None else "" for k, v in slots.items()}
+    return RenderedEmail(
+        subject=subject.format_map(slots),
+        html=html_fmt.format_map(html_slots),
+        text=text_fmt.format_map(slots),
+    )
+
+
+@overload
+def render_many(kind: Literal["propose"], items: Iterable[Tuple[str, ProposeSlots]]) -> List[RenderedEmail]: ...
+
+
+@overload
+def render_many(kind: Literal["confirm"], items: Iterable[Tuple[str, ConfirmSlots]]) -> List[RenderedEmail]: ...
+
+
+@overload
+def render_many(kind: NoticeKind, items: Iterable[Tuple[str, NoticeSlots]]) -> List[RenderedEmail]: ...
+
+
+def render_many(kind: str, items: Iterable[Tuple[str, Mapping[str, Optional[str]]]]) -> List[RenderedEmail]:
+    """Render a batch of ``(lang, slots)`` pairs, e.g. for digests or bulk notices."""
+    return [render_email(kind, lang, slots) for lang, slots in items]
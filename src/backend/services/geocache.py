@@ -0,0 +1,168 @@
+"""Place name → coordinates → timezone cache backed by the ``geocache`` table.
+
+Keys are normalized place names (Unicode-normalized, case-folded, whitespace and
+comma spacing collapsed), so "Wien,  Österreich" and "wien, österreich" share an
+entry. A per-process LRU sits in front of the table. Resolutions are written
+through only when the caller asks for it (``store=True``): the authenticated
+profile update does, the anonymous ``POST /api/timezone`` only reads, so an
+unauthenticated client cannot plant coordinates under a place name. The stored
+zone is always computed here from the coordinates, never taken from a client, so
+a zone a user picked by hand does not leak into other users' lookups.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+
+from src.backend.db import session_scope
+from src.backend.models import GeoCache
+from src.backend.services.timezones import zone_at
+
+GEOCACHE_LOCAL_SIZE = int(os.getenv("GEOCACHE_LOCAL_SIZE", "2048"))
+# A cached place is only reused for coordinates this close to its own (~1 km)
+GEOCACHE_MATCH_DEGREES = float(os.getenv("GEOCACHE_MATCH_DEGREES", "0.01"))
+# Longer names are not cached (keeps arbitrary client strings out of the table)
+MAX_PLACE_NAME_LENGTH = 512
+
+logger = logging.getLogger("soultribe.geocache")
+
+
+class GeoEntry(NamedTuple):
+    lat: float
+    lon: float
+    tz: Optional[str]
+
+
+_local: "OrderedDict[str, GeoEntry]" = OrderedDict()
+_lock = threading.Lock()
+_counters: Dict[str, int] = {"local_hits": 0, "db_hits": 0, "misses": 0, "stores": 0}
+
+
+def normalize_place(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    text = unicodedata.normalize("NFKC", str(name)).casefold()
+    parts = [" ".join(part.split()) for part in text.split(",")]
+    key = ", ".join(part for part in parts if part)
+    if not key or len(key) > MAX_PLACE_NAME_LENGTH:
+        return None
+    return key
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def _remember_local(key: str, entry: GeoEntry) -> None:
+    with _lock:
+        _local[key] = entry
+        _local.move_to_end(key)
+        while len(_local) > GEOCACHE_LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def _near(entry: GeoEntry, lat: float, lon: float) -> bool:
+    return abs(entry.lat - lat) <= GEOCACHE_MATCH_DEGREES and abs(entry.lon - lon) <= GEOCACHE_MATCH_DEGREES
+
+
+def lookup(name: Optional[str], session=None) -> Optional[GeoEntry]:
+    """Cached coordinates and zone for a place name, or ``None``.
+
+    ``session`` is used for the table read when given (no commit); otherwise a
+    short-lived session is opened, and only on an LRU miss.
+    """
+    key = normalize_place(name)
+    if key is None:
+        return None
+    with _lock:
+        entry = _local.get(key)
+        if entry is not None:
+            _local.move_to_end(key)
+    if entry is not None:
+        _count("local_hits")
+        return entry
+    try:
+        if session is not None:
+            row = session.get(GeoCache, key)
+        else:
+            with session_scope() as own:
+                row = own.get(GeoCache, key)
+    except Exception as exc:
+        logger.warning("geocache: lookup failed for %r: %s", key, exc)
+        return None
+    if row is None or row.lat is None or row.lon is None:
+        _count("misses")
+        return None
+    entry = GeoEntry(row.lat, row.lon, row.tz)
+    _remember_local(key, entry)
+    _count("db_hits")
+    return entry
+
+
+def remember(name: Optional[str], entry: GeoEntry, source: str) -> None:
+    """Write ``entry`` through to the LRU and the table (own transaction, best effort)."""
+    key = normalize_place(name)
+    if key is None:
+        return
+    with _lock:
+        current = _local.get(key)
+    if current == entry:
+        return
+    _remember_local(key, entry)
+    stmt = insert(GeoCache).values(name=key, lat=entry.lat, lon=entry.lon, tz=entry.tz, source=source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GeoCache.name],
+        set_={"lat": entry.lat, "lon": entry.lon, "tz": entry.tz, "source": source},
+    )
+    try:
+        with session_scope() as own:
+            own.exec(stmt)
+            own.commit()
+    except Exception as exc:
+        logger.warning("geocache: store failed for %r: %s", key, exc)
+        return
+    _count("stores")
+
+
+def resolve(
+    name: Optional[str],
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    *,
+    source: str,
+    session=None,
+    store: bool = False,
+) -> Optional[GeoEntry]:
+    """Coordinates and zone for a place, from the cache when possible.
+
+    With coordinates, a cached entry counts only if it lies within
+    ``GEOCACHE_MATCH_DEGREES`` of them; otherwise the zone is computed from the
+    given coordinates, and written through under ``name`` when ``store`` is set
+    (authenticated callers only). Returns ``None`` when neither the cache nor the
+    coordinates give an answer.
+    """
+    have_coords = lat is not None and lon is not None
+    entry = lookup(name, session=session)
+    if entry is not None and entry.tz and (not have_coords or _near(entry, lat, lon)):
+        return entry
+    if not have_coords:
+        return None
+    tz = zone_at(lat, lon)
+    if tz is None:
+        return None
+    entry = GeoEntry(float(lat), float(lon), tz)
+    if store:
+        remember(name, entry, source)
+    return entry
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters, local_entries=len(_local))
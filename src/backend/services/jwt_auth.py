@@ -1,7 +1,10 @@
 from __future__ import annotations
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from jose import jwt, JWTError
 from fastapi import Depends, HTTPException
@@ -10,6 +13,13 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+# Verified tokens remembered per process; 0 disables the cache
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "4096"))
+
+# token -> (claims, exp as unix seconds)
+_verified: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+_verified_lock = threading.Lock()
+_cache_counters: Dict[str, int] = {"hits": 0, "misses": 0}
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -20,11 +30,48 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 
 def verify_token(token: str) -> Dict[str, Any]:
+    """Decode and verify ``token``; raises ValueError when it is invalid or expired.
+
+    Verified claims are kept in a bounded LRU until the token's ``exp``, so the
+    several requests a page load makes with one access token verify it only once.
+    """
+    now = time.time()
+    with _verified_lock:
+        entry = _verified.get(token)
+        if entry is not None:
+            if entry[1] > now:
+                _verified.move_to_end(token)
+                _cache_counters["hits"] += 1
+                return dict(entry[0])
+            del _verified[token]
+        _cache_counters["misses"] += 1
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError as e:
         raise ValueError(f"Invalid token: {e}")
+    exp = payload.get("exp")
+    # Tokens without exp never expire by themselves; leave those to full verification
+    if JWT_CACHE_SIZE > 0 and isinstance(exp, (int, float)):
+        with _verified_lock:
+            _verified[token] = (dict(payload), float(exp))
+            _verified.move_to_end(token)
+            while len(_verified) > JWT_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return payload
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    with _verified_lock:
+        hits, misses = _cache_counters["hits"], _cache_counters["misses"]
+        size = len(_verified)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+        "entries": size,
+        "max_entries": JWT_CACHE_SIZE,
+    }
 
 
 _bearer = HTTPBearer(auto_error=True)
@@ -0,0 +1,99 @@
+"""Content-addressed cache for LLM completions.
+
+Keys are a SHA-256 over model, system prompt and the normalized prompt sequence,
+so identical radix/breakdown + language + prompt inputs share one stored reply.
+Redis is the shared tier (with TTL); a small per-process LRU keeps working when
+Redis is down and saves the round trip for hot entries.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+from src.backend.services.redis_client import cache_get, cache_set, get_redis_client
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_LOCAL_SIZE = int(os.getenv("LLM_CACHE_LOCAL_SIZE", "256"))
+# Replies larger than this are not cached (keeps a runaway generation out of Redis)
+LLM_CACHE_MAX_BYTES = 64 * 1024
+
+_KEY_PREFIX = "llm:reply:v1:"
+_STATS_KEY = "llm:cache:stats"
+
+_local: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+_counters: Dict[str, int] = {"hits": 0, "local_hits": 0, "misses": 0, "stores": 0}
+
+
+def normalize_seq(seq: Sequence[str]) -> list[str]:
+    return [" ".join(str(part).split()) for part in seq if str(part).strip()]
+
+
+def cache_key(model: str, system_prompt: str, seq: Sequence[str]) -> str:
+    blob = json.dumps([model, system_prompt, normalize_seq(seq)], ensure_ascii=False, separators=(",", ":"))
+    return _KEY_PREFIX + hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+    # Shared counters so ops sees totals across worker processes; best effort
+    client = get_redis_client()
+    if client is not None:
+        try:
+            client.hincrby(_STATS_KEY, name, 1)
+        except Exception:
+            pass
+
+
+def _remember(key: str, reply: str) -> None:
+    with _lock:
+        _local[key] = reply
+        _local.move_to_end(key)
+        while len(_local) > LLM_CACHE_LOCAL_SIZE:
+            _local.popitem(last=False)
+
+
+def get(key: str) -> Optional[str]:
+    with _lock:
+        reply = _local.get(key)
+        if reply is not None:
+            _local.move_to_end(key)
+    if reply is not None:
+        _count("local_hits")
+        return reply
+    raw = cache_get(key)
+    if raw:
+        reply = raw.decode("utf-8")
+        _remember(key, reply)
+        _count("hits")
+        return reply
+    _count("misses")
+    return None
+
+
+def put(key: str, reply: str) -> None:
+    data = reply.encode("utf-8")
+    if not data or len(data) > LLM_CACHE_MAX_BYTES:
+        return
+    _remember(key, reply)
+    cache_set(key, data, LLM_CACHE_TTL_SECONDS)
+    _count("stores")
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters for this process and, when Redis is up, across all processes."""
+    with _lock:
+        local = dict(_counters, local_entries=len(_local))
+    shared: Dict[str, int] = {}
+    client = get_redis_client()
+    if client is not None:
+        try:
+            shared = {k.decode(): int(v) for k, v in (client.hgetall(_STATS_KEY) or {}).items()}
+        except Exception:
+            shared = {}
+    return {"process": local, "shared": shared}
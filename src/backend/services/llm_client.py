@@ -0,0 +1,193 @@
+"""In-process client for the OpenAI-compatible chat endpoint (OpenWebUI / Ollama).
+
+Python counterpart of services/llm/ollama.js: same env vars, endpoint and system
+prompt, but one pooled keep-alive HTTP client per process and a bounded number of
+concurrent completions instead of a Node process per request.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Iterator, List, Optional, Sequence
+
+import httpx
+
+from src.backend.services import llm_cache
+
+LLM_BASE = os.getenv("OLLAMA_BASE") or os.getenv("OPENAI_BASE_URL") or "https://at1.dynproxy.net"
+LLM_API_KEY = os.getenv("OLLAMA_API_KEY") or os.getenv("OPENAI_API_KEY") or ""
+LLM_MODEL = os.getenv("OLLAMA_MODEL", "gemma3:1b")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# How long a request may wait for a free slot before giving up with LLMBusy
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+SYSTEM_PROMPT = (
+    "You are the SoulTribe Assistant. Always follow the user's instructions exactly and reply in the "
+    "language requested by the user content (for example: if the prompt says 'Respond in German', reply "
+    "fully in German). Keep responses concise and friendly."
+)
+
+
+class LLMError(RuntimeError):
+    """The model endpoint failed or returned no usable content."""
+
+
+class LLMBusy(LLMError):
+    """All completion slots stayed busy for the whole queue timeout."""
+
+
+class LLMClient:
+    def __init__(
+        self,
+        base_url: str = LLM_BASE,
+        *,
+        api_key: str = LLM_API_KEY,
+        model: str = LLM_MODEL,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.model = model
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._http = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+
+    def _payload(self, seq: Sequence[str], *, stream: bool = False) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": " ".join(seq)},
+            ],
+            "stream": stream,
+        }
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise LLMBusy("LLM is busy, try again shortly")
+
+    def complete(self, seq: Sequence[str]) -> str:
+        """Run one chat completion for the prompt sequence and return the reply text."""
+        self._acquire()
+        try:
+            try:
+                resp = self._http.post("/api/chat/completions", json=self._payload(seq))
+            except httpx.HTTPError as exc:
+                raise LLMError(f"LLM request failed: {exc}") from exc
+            if resp.status_code != 200:
+                raise LLMError(f"LLM API error: HTTP {resp.status_code}")
+            try:
+                content = resp.json()["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError) as exc:
+                raise LLMError("LLM returned an unexpected response") from exc
+        finally:
+            self._slots.release()
+        text = (content or "").strip()
+        if not text:
+            raise LLMError("LLM returned an empty response")
+        return text
+
+    def stream(self, seq: Sequence[str]) -> Iterator[str]:
+        """Yield reply text deltas as the model produces them (OpenAI-style SSE chunks)."""
+        self._acquire()
+        try:
+            try:
+                with self._http.stream("POST", "/api/chat/completions", json=self._payload(seq, stream=True)) as resp:
+                    if resp.status_code != 200:
+                        raise LLMError(f"LLM API error: HTTP {resp.status_code}")
+                    for line in resp.iter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            choices = json.loads(data).get("choices") or []
+                        except (ValueError, AttributeError):
+                            continue
+                        delta = ((choices[0] or {}).get("delta") or {}).get("content") if choices else None
+                        if delta:
+                            yield delta
+            except httpx.HTTPError as exc:
+                raise LLMError(f"LLM request failed: {exc}") from exc
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        self._http.close()
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_llm_client() -> LLMClient:
+    """Process-wide client, created on first use (after gunicorn forks)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+def complete(seq: List[str], *, use_cache: bool = True) -> str:
+    """Completion for ``seq``, served from the content-addressed cache when possible."""
+    client = get_llm_client()
+    key = llm_cache.cache_key(client.model, SYSTEM_PROMPT, seq)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+    reply = client.complete(seq)
+    llm_cache.put(key, reply)
+    return reply
+
+
+def stream(seq: List[str]) -> Iterator[str]:
+    """Streaming variant of :func:`complete`; a cached reply is yielded as one chunk."""
+    client = get_llm_client()
+    key = llm_cache.cache_key(client.model, SYSTEM_PROMPT, seq)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+    parts: List[str] = []
+    for delta in client.stream(seq):
+        parts.append(delta)
+        yield delta
+    reply = "".join(parts).strip()
+    if not reply:
+        raise LLMError("LLM returned an empty response")
+    llm_cache.put(key, reply)
+
+
+# Disable proxy buffering (nginx) so chunks reach the browser as they are produced
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    head = f"event: {event}\n" if event else ""
+    return f"{head}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def open_stream(seq: List[str]) -> tuple[str, Iterator[str]]:
+    """Start streaming and wait for the first chunk.
+
+    Raises LLMError/LLMBusy before any bytes are sent, so callers can still answer
+    with a proper HTTP status. Returns (first chunk, remaining chunks).
+    """
+    chunks = stream(seq)
+    try:
+        first = next(chunks)
+    except StopIteration:
+        raise LLMError("LLM returned an empty response")
+    return first, chunks
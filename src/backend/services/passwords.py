@@ -0,0 +1,111 @@
+"""Password hashing off the request threads.
+
+argon2 is deliberately CPU- and memory-hard (~64 MiB, tens of ms per call), so
+hash/verify run in a small per-process pool of child processes instead of the
+web worker's threads. The pool admits at most ``PASSWORD_HASH_WORKERS +
+PASSWORD_HASH_QUEUE`` calls at a time; beyond that callers get
+:class:`PasswordHasherBusy` (mapped to 503) rather than queueing behind a login burst.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+# Processes per web worker; 0 hashes inline in the calling thread (dev, scripts)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "1"))
+# Calls allowed to wait for a busy pool before new ones are refused
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "4"))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+# Unset values keep argon2-cffi's defaults. Changing them makes check_needs_rehash
+# flag existing hashes, which are then upgraded on the user's next login.
+_ph_kwargs = {
+    name: int(os.environ[env])
+    for name, env in (
+        ("time_cost", "ARGON2_TIME_COST"),
+        ("memory_cost", "ARGON2_MEMORY_COST"),
+        ("parallelism", "ARGON2_PARALLELISM"),
+    )
+    if os.getenv(env)
+}
+ph = PasswordHasher(**_ph_kwargs)
+
+
+class PasswordHasherBusy(RuntimeError):
+    """The hashing pool and its queue are full."""
+
+
+# Run inside the pool processes; module-level so they can be pickled by reference
+def _hash(password: str) -> str:
+    return ph.hash(password)
+
+
+def _verify(password_hash: str, password: str) -> bool:
+    try:
+        return ph.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, PASSWORD_HASH_WORKERS) + max(0, PASSWORD_HASH_QUEUE))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn: forking a threaded web worker can copy held locks into the child
+                _pool = ProcessPoolExecutor(
+                    max_workers=PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pool
+
+
+def _run(fn, *args):
+    global _pool
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Too many password operations in progress, try again shortly")
+    try:
+        if PASSWORD_HASH_WORKERS <= 0:
+            return fn(*args)
+        pool = _get_pool()
+        try:
+            return pool.submit(fn, *args).result(timeout=PASSWORD_HASH_TIMEOUT_SECONDS)
+        except FutureTimeout:
+            raise PasswordHasherBusy("Password hashing timed out, try again shortly")
+        except BrokenProcessPool:
+            # A child died (e.g. OOM-killed); start a fresh pool for the next call
+            with _pool_lock:
+                if _pool is pool:
+                    _pool = None
+            raise PasswordHasherBusy("Password hashing unavailable, try again shortly")
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """True when ``password`` matches; False for a wrong password or malformed hash."""
+    return _run(_verify, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    # Only parses the hash's parameter string; cheap enough for the request thread
+    try:
+        return ph.check_needs_rehash(password_hash)
+    except (InvalidHashError, ValueError):
+        return False
@@ -1,53 +1,242 @@
 from __future__ import annotations
 
+import abc
+import logging
+import os
 import threading
 import time
+import uuid
 from collections import defaultdict, deque
-from typing import Deque, Dict, Tuple
+from typing import Deque, Dict, Optional, Tuple
 
 from fastapi import HTTPException, Request
 
+from src.backend.services.jwt_auth import verify_token
+from src.backend.services.redis_client import get_redis_client
 
-class RateLimiter:
+# "memory" (per process) or "redis" (shared by all workers, falls back to memory when Redis is down)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").strip().lower()
+# "window" (sliding window, one timestamp per hit) or "gcra" (one timestamp per key)
+RATE_LIMIT_ALGORITHM = os.getenv("RATE_LIMIT_ALGORITHM", "window").strip().lower()
+# How often the in-memory limiter drops keys whose window has passed
+RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("RATE_LIMIT_SWEEP_SECONDS", "60"))
+
+logger = logging.getLogger("soultribe.rate_limit")
+
+
+class _Limiter(abc.ABC):
+    @abc.abstractmethod
+    def check(self, scope: str, identifier: str, limit: int, window_seconds: int) -> float:
+        """Record a hit; returns 0 when allowed, else seconds until the next free slot."""
+
+    def hit(self, scope: str, identifier: str, limit: int, window_seconds: int) -> None:
+        retry_after = self.check(scope, identifier, limit, window_seconds)
+        if retry_after > 0:
+            raise _too_many(retry_after)
+
+
+class RateLimiter(_Limiter):
     """In-memory sliding window rate limiter keyed by (scope, identifier)."""
 
-    def __init__(self) -> None:
+    def __init__(self, sweep_seconds: float = RATE_LIMIT_SWEEP_SECONDS) -> None:
         self._hits: Dict[Tuple[str, str], Deque[float]] = defaultdict(deque)
+        self._windows: Dict[str, int] = {}
         self._lock = threading.Lock()
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = time.monotonic() + sweep_seconds
 
-    def hit(self, scope: str, identifier: str, limit: int, window_seconds: int) -> None:
+    def check(self, scope: str, identifier: str, limit: int, window_seconds: int) -> float:
         now = time.monotonic()
         key = (scope, identifier)
         with self._lock:
+            self._windows[scope] = window_seconds
+            if now >= self._next_sweep:
+                self._sweep(now)
             bucket = self._hits[key]
             cutoff = now - window_seconds
             while bucket and bucket[0] <= cutoff:
                 bucket.popleft()
             if len(bucket) >= limit:
-                retry_after = max(0.0, bucket[0] + window_seconds - now)
-                raise HTTPException(
-                    status_code=429,
-                    detail="Too many requests. Please try again later.",
-                    headers={"Retry-After": str(int(retry_after) + 1)},
-                )
+                return max(0.0, bucket[0] + window_seconds - now)
             bucket.append(now)
+            return 0.0
+
+    def _sweep(self, now: float) -> None:
+        # A bucket whose newest hit is outside the window holds no live hits; without
+        # this, every distinct IP ever seen keeps its (scope, ip) entry forever
+        idle = [
+            key for key, bucket in self._hits.items()
+            if not bucket or bucket[-1] <= now - self._windows.get(key[0], 0)
+        ]
+        for key in idle:
+            del self._hits[key]
+        self._next_sweep = now + self._sweep_seconds
+
+
+class GcraRateLimiter(_Limiter):
+    """In-memory GCRA (token bucket) limiter: one float per (scope, identifier).
+
+    ``limit`` requests may burst at once, after which one request is let through
+    every ``window_seconds / limit``. State is the theoretical arrival time (TAT)
+    of the next request, so memory and work per check do not depend on ``limit``.
+    """
+
+    def __init__(self, sweep_seconds: float = RATE_LIMIT_SWEEP_SECONDS) -> None:
+        self._tat: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._sweep_seconds = sweep_seconds
+        self._next_sweep = time.monotonic() + sweep_seconds
+
+    def check(self, scope: str, identifier: str, limit: int, window_seconds: int) -> float:
+        now = time.monotonic()
+        key = (scope, identifier)
+        interval = window_seconds / limit
+        with self._lock:
+            if now >= self._next_sweep:
+                # A TAT in the past is the same as no entry
+                for stale in [k for k, tat in self._tat.items() if tat <= now]:
+                    del self._tat[stale]
+                self._next_sweep = now + self._sweep_seconds
+            tat = max(self._tat.get(key, now), now) + interval
+            allow_at = tat - window_seconds
+            if allow_at > now:
+                return allow_at - now
+            self._tat[key] = tat
+            return 0.0
+
+
+# Sliding window over a sorted set of hit timestamps (microseconds, Redis clock), in
+# one round trip. KEYS[1] = bucket; ARGV = limit, window in ms, unique member.
+# Returns 0 when the hit is recorded, else milliseconds until the oldest hit expires.
+# (ARGV[3] makes members unique so hits in the same microsecond all count.)
+_SLIDING_WINDOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2]) * 1000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+  local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+  return math.max(1, math.ceil((tonumber(oldest[2]) + window - now) / 1000))
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 0
+"""
+
+# GCRA with the TAT (microseconds, Redis clock) as a plain string value.
+# KEYS[1] = key; ARGV = limit, window in ms. Same return convention as above.
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+local window = tonumber(ARGV[2]) * 1000
+local interval = window / tonumber(ARGV[1])
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now) + interval
+local allow_at = tat - window
+if allow_at > now then
+  return math.max(1, math.ceil((allow_at - now) / 1000))
+end
+redis.call('SET', KEYS[1], string.format('%d', tat), 'PX', math.ceil((tat - now) / 1000))
+return 0
+"""
+
+
+class RedisRateLimiter(_Limiter):
+    """Rate limits shared by every worker process through Redis.
+
+    Falls back to an in-memory limiter of this process while Redis is unreachable,
+    so an outage loosens limits instead of failing requests.
+    """
+
+    def __init__(self, algorithm: str = "window") -> None:
+        if algorithm == "gcra":
+            self.key_prefix, self._source, self._fallback = "rl:gcra:", _GCRA_LUA, GcraRateLimiter()
+        else:
+            self.key_prefix, self._source, self._fallback = "rl:", _SLIDING_WINDOW_LUA, RateLimiter()
+        self._script = None
+        self._script_client = None
+        self._degraded = False
+
+    def _redis_check(self, scope: str, identifier: str, limit: int, window_seconds: int) -> Optional[float]:
+        client = get_redis_client()
+        if client is None:
+            return None
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(self._source)
+            self._script_client = client
+        try:
+            retry_ms = self._script(
+                keys=[f"{self.key_prefix}{scope}:{identifier}"],
+                args=[limit, int(window_seconds * 1000), uuid.uuid4().hex],
+            )
+        except Exception as exc:
+            if not self._degraded:
+                self._degraded = True
+                logger.warning("rate_limit: redis check failed, using in-memory window: %s", exc)
+            return None
+        if self._degraded:
+            self._degraded = False
+            logger.info("rate_limit: redis check recovered")
+        return int(retry_ms) / 1000.0
+
+    def check(self, scope: str, identifier: str, limit: int, window_seconds: int) -> float:
+        retry_after = self._redis_check(scope, identifier, limit, window_seconds)
+        if retry_after is None:
+            return self._fallback.check(scope, identifier, limit, window_seconds)
+        return retry_after
+
+
+def _too_many(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Too many requests. Please try again later.",
+        headers={"Retry-After": str(int(retry_after) + 1)},
+    )
+
+
+def _build_limiter(backend: str, algorithm: str) -> _Limiter:
+    if algorithm not in ("window", "gcra"):
+        logger.warning("rate_limit: unknown RATE_LIMIT_ALGORITHM=%r, using window", algorithm)
+        algorithm = "window"
+    if backend == "redis":
+        return RedisRateLimiter(algorithm)
+    if backend != "memory":
+        logger.warning("rate_limit: unknown RATE_LIMIT_BACKEND=%r, using memory", backend)
+    return GcraRateLimiter() if algorithm == "gcra" else RateLimiter()
+
+
+_rate_limiter = _build_limiter(RATE_LIMIT_BACKEND, RATE_LIMIT_ALGORITHM)
 
-            # Trim empty bucket to avoid unbounded growth when cleanup removed all entries
-            if not bucket:
-                self._hits.pop(key, None)
 
+def _token_subject(request: Request) -> Optional[str]:
+    auth = request.headers.get("authorization") or ""
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        sub = verify_token(token.strip()).get("sub")
+    except ValueError:
+        return None
+    return str(sub) if sub is not None else None
 
-_rate_limiter = RateLimiter()
 
+def rate_limit(scope: str, limit: int, window_seconds: int, *, per_user: bool = False):
+    """FastAPI dependency factory enforcing a per-identifier rate limit.
 
-def rate_limit(scope: str, limit: int, window_seconds: int):
-    """FastAPI dependency factory enforcing a per-identifier rate limit."""
+    The identifier is the client IP. With ``per_user`` a valid bearer token's
+    ``sub`` is used instead, so users behind one NAT or proxy do not share a
+    budget; requests without a valid token still count against their IP.
+    """
 
     def dependency(request: Request) -> None:
         identifier = "unknown"
-        client = getattr(request, "client", None)
-        if client and client.host:
-            identifier = client.host
+        sub = _token_subject(request) if per_user else None
+        if sub is not None:
+            identifier = f"user:{sub}"
+        else:
+            client = getattr(request, "client", None)
+            if client and client.host:
+                identifier = client.host
         _rate_limiter.hit(scope, identifier, limit, window_seconds)
 
     return dependency
@@ -2,23 +2,34 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+import time
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-try:
-    from redis import Redis  # type: ignore
-except ImportError as exc:  # pragma: no cover - redis is optional
-    raise RuntimeError("`redis` package is required for caching support.") from exc
+if TYPE_CHECKING:  # redis is imported on first use; a missing package disables caching
+    from redis import Redis
 DEFAULT_REDIS_DB = os.getenv("REDIS_DB", "1")
 DEFAULT_REDIS_URL = f"redis://127.0.0.1:6379/{DEFAULT_REDIS_DB}"
 
+# After a failed connect, callers get None for this long before the next attempt
+REDIS_RETRY_SECONDS = 30.0
+
 logger = logging.getLogger(__name__)
 _redis_warning_emitted = False
+_client: Optional[Redis] = None
+_client_lock = threading.Lock()
+_retry_at = 0.0
 
 def _build_client() -> Optional[Redis]:
     url = os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
     if not url:
         return None
+    try:
+        from redis import Redis
+    except ImportError as exc:  # pragma: no cover - redis is optional
+        _log_unavailable("redis package not installed", exc)
+        return None
     client = Redis.from_url(url, decode_responses=False)
     try:
         client.ping()
@@ -29,16 +40,29 @@ def _build_client() -> Optional[Redis]:
 
 
 def get_redis_client() -> Optional[Redis]:
-    """Return a reusable Redis client or ``None`` when unavailable."""
+    """Return a reusable Redis client or ``None`` when unavailable.
 
-    try:
-        client = _build_client()
-        if client is None:
-            _log_unavailable("no client")
-        return client
-    except Exception as exc:
-        _log_unavailable("client error", exc)
+    The client (and its connection pool) is shared by the whole process. A failed
+    connect is retried at most every ``REDIS_RETRY_SECONDS`` so callers do not pay
+    a connect timeout on every request while Redis is down.
+    """
+    global _client, _retry_at
+    if _client is not None:
+        return _client
+    if time.monotonic() < _retry_at:
         return None
+    with _client_lock:
+        if _client is None and time.monotonic() >= _retry_at:
+            try:
+                _client = _build_client()
+                if _client is None:
+                    _log_unavailable("no client")
+            except Exception as exc:
+                _log_unavailable("client error", exc)
+                _client = None
+            if _client is None:
+                _retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+    return _client
 
 
 def cache_get(key: str) -> Optional[bytes]:
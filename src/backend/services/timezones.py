@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Offsets are sampled at this step and transitions bisected to the second;
+# real zones never change offset twice within a few hours.
+_TABLE_STEP_SECONDS = 6 * 3600
+
+OffsetTable = Tuple[Tuple[int, ...], Tuple[timezone, ...]]
+
+
+@lru_cache(maxsize=1024)
+def _zone(name: str) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
+
+
+def get_zone(name: Optional[str]) -> Optional[ZoneInfo]:
+    """Cached ZoneInfo lookup; ``None`` for empty or unknown zone names."""
+    if not name:
+        return None
+    return _zone(str(name).strip())
+
+
+def _as_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _fixed_at(zone: ZoneInfo, ts: int) -> timezone:
+    local = datetime.fromtimestamp(ts, zone)
+    return timezone(local.utcoffset(), local.tzname())
+
+
+def _same(a: timezone, b: timezone) -> bool:
+    # timezone equality ignores the name; CET vs CEST style changes matter for %Z
+    return a.utcoffset(None) == b.utcoffset(None) and a.tzname(None) == b.tzname(None)
+
+
+@lru_cache(maxsize=512)
+def _offset_table(name: str, first_day: date, last_day: date) -> OffsetTable:
+    """UTC-offset segments of ``name`` covering ``[first_day, last_day]`` (UTC days).
+
+    Returns (segment start timestamps, fixed-offset tzinfo per segment).
+    """
+    zone = _zone(name)
+    start = int(datetime.combine(first_day, time(), tzinfo=timezone.utc).timestamp())
+    end = int(datetime.combine(last_day + timedelta(days=1), time(), tzinfo=timezone.utc).timestamp())
+    starts = [start]
+    tzs = [_fixed_at(zone, start)]
+    t = start
+    while t < end:
+        nxt = min(t + _TABLE_STEP_SECONDS, end)
+        tz_next = _fixed_at(zone, nxt)
+        if not _same(tz_next, tzs[-1]):
+            lo, hi = t, nxt
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if _same(_fixed_at(zone, mid), tzs[-1]):
+                    lo = mid
+                else:
+                    hi = mid
+            starts.append(hi)
+            tzs.append(tz_next)
+        t = nxt
+    return tuple(starts), tuple(tzs)
+
+
+def localize(instants: Sequence[datetime], zone_name: Optional[str]) -> Optional[List[datetime]]:
+    """Convert instants to local time in ``zone_name``, preserving order.
+
+    Uses a cached offset table over the span of ``instants`` so each conversion is a
+    bisect plus a fixed-offset shift. The returned datetimes carry a fixed-offset tzinfo
+    named like the zone abbreviation (``%Z`` still yields e.g. ``CEST``).
+    Returns ``None`` when the zone is unknown.
+    """
+    zone = get_zone(zone_name)
+    if zone is None:
+        return None
+    utc = [_as_utc(dt) for dt in instants]
+    if not utc:
+        return []
+    starts, tzs = _offset_table(zone.key, min(utc).date(), max(utc).date())
+    return [dt.astimezone(tzs[bisect.bisect_right(starts, dt.timestamp()) - 1]) for dt in utc]
+
+
+def localize_many(instants: Sequence[datetime], zone_names: Iterable[Optional[str]]) -> Dict[str, List[datetime]]:
+    """Localize the same instants for several zones; unknown zones are omitted."""
+    utc = [_as_utc(dt) for dt in instants]
+    out: Dict[str, List[datetime]] = {}
+    for name in dict.fromkeys(n for n in zone_names if n):
+        local = localize(utc, name)
+        if local is not None:
+            out[name] = local
+    return out
+
+
+# ---- Coordinate -> zone name lookup ----
+
+# Lookups are cached per coordinate rounded to this many decimals (3 ≈ 110 m), so
+# repeated geocoder results for the same city hit the cache
+TZ_LOOKUP_PRECISION = int(os.getenv("TZ_LOOKUP_PRECISION", "3"))
+TZ_LOOKUP_CACHE_SIZE = int(os.getenv("TZ_LOOKUP_CACHE_SIZE", "4096"))
+
+# Areas timezonefinder has misidentified (e.g. Vienna as Paris):
+# (lat_min, lat_max, lon_min, lon_max, zone), first match wins
+TZ_OVERRIDES: Tuple[Tuple[float, float, float, float, str], ...] = (
+    (48.0, 48.5, 16.0, 16.8, "Europe/Vienna"),
+    (52.3, 52.7, 13.0, 13.8, "Europe/Berlin"),
+    (47.2, 47.5, 8.3, 8.8, "Europe/Zurich"),
+    (50.0, 50.2, 14.2, 14.7, "Europe/Prague"),
+)
+
+_tf = None
+_tf_lock = threading.Lock()
+
+
+def get_timezone_finder():
+    """Process-wide TimezoneFinder, built on first use.
+
+    Polygon coordinates are memory-mapped (``in_memory=False``) rather than copied
+    onto each worker's heap, so all workers share them through the page cache.
+    gunicorn's when_ready hook builds the finder in the preloaded master; forked
+    workers inherit the mapping and its offset tables.
+    """
+    global _tf
+    if _tf is None:
+        with _tf_lock:
+            if _tf is None:
+                from timezonefinder import TimezoneFinder
+
+                _tf = TimezoneFinder(in_memory=False)
+    return _tf
+
+
+def _override_zone(lat: float, lon: float) -> Optional[str]:
+    for lat_min, lat_max, lon_min, lon_max, zone in TZ_OVERRIDES:
+        if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+            return zone
+    return None
+
+
+@lru_cache(maxsize=TZ_LOOKUP_CACHE_SIZE)
+def _finder_zone(lat: float, lon: float) -> Optional[str]:
+    tf = get_timezone_finder()
+    zone = tf.timezone_at(lat=lat, lng=lon)
+    if not zone:
+        # Older timezonefinder releases return None at sea; try the nearest zone
+        closest = getattr(tf, "closest_timezone_at", None)
+        zone = closest(lat=lat, lng=lon) if closest else None
+    return zone
+
+
+def zone_at(lat: float, lon: float) -> Optional[str]:
+    """IANA zone name at a coordinate; ``None`` when none can be determined."""
+    return zones_at([(lat, lon)])[0]
+
+
+def zones_at(points: Iterable[Tuple[float, float]]) -> List[Optional[str]]:
+    """:func:`zone_at` for many (lat, lon) points, in input order.
+
+    Points that round to the same cache key are resolved once per call, so a batch
+    of people from the same city costs one lookup.
+    """
+    resolved: Dict[Tuple[float, float], Optional[str]] = {}
+    out: List[Optional[str]] = []
+    for lat, lon in points:
+        zone = _override_zone(lat, lon)
+        if zone is None:
+            key = (round(lat, TZ_LOOKUP_PRECISION), round(lon, TZ_LOOKUP_PRECISION))
+            if key not in resolved:
+                resolved[key] = _finder_zone(*key)
+            zone = resolved[key]
+        out.append(zone)
+    return out
+
+
+def zone_lookup_stats() -> Dict[str, Any]:
+    info = _finder_zone.cache_info()
+    total = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / total, 4) if total else 0.0,
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "precision": TZ_LOOKUP_PRECISION,
+    }
@@ -17,6 +17,7 @@ if REPO_ROOT not in sys.path:
 
 from db import session_scope, DATABASE_URL
 from models import User, AvailabilitySlot, Meetup
+from services.availability import refresh_user_ranges
 
 
 def utcnow_naive() -> datetime:
@@ -67,7 +68,12 @@ def delete_slots(slot_ids: list[int]) -> int:
         return 0
     from sqlalchemy import delete
     with session_scope() as session:
+        user_ids = session.exec(
+            select(AvailabilitySlot.user_id).where(AvailabilitySlot.id.in_(slot_ids)).distinct()
+        ).all()
         session.exec(delete(AvailabilitySlot).where(AvailabilitySlot.id.in_(slot_ids)))
+        for user_id in user_ids:
+            refresh_user_ranges(session, user_id)
         session.commit()
     return len(slot_ids)
 
@@ -97,6 +103,47 @@ def delete_meetups(meetup_ids: list[int]) -> int:
     return len(meetup_ids)
 
 
+# --------------------- Auth tokens: reap expired/revoked ---------------------
+
+def _stale_token_conditions(grace_hours: int) -> list:
+    from sqlalchemy import or_
+    from models import RefreshToken, EmailVerificationToken, PasswordResetToken
+
+    cutoff = utcnow_naive() - timedelta(hours=grace_hours)
+    return [
+        (RefreshToken, or_(RefreshToken.expires_at < cutoff, RefreshToken.revoked_at < cutoff)),
+        (EmailVerificationToken, EmailVerificationToken.expires_at < cutoff),
+        (PasswordResetToken, PasswordResetToken.expires_at < cutoff),
+    ]
+
+
+def count_stale_tokens(grace_hours: int) -> dict[str, int]:
+    from sqlalchemy import func
+    counts: dict[str, int] = {}
+    with session_scope() as session:
+        for model, cond in _stale_token_conditions(grace_hours):
+            counts[model.__name__] = session.exec(select(func.count()).select_from(model).where(cond)).one()
+    return counts
+
+
+def delete_stale_tokens(grace_hours: int, batch_size: int = 5000) -> dict[str, int]:
+    """Delete expired/revoked tokens in batches of ``batch_size`` rows, one commit per batch."""
+    from sqlalchemy import delete
+    deleted: dict[str, int] = {}
+    for model, cond in _stale_token_conditions(grace_hours):
+        total = 0
+        while True:
+            batch = select(model.id).where(cond).limit(batch_size)
+            with session_scope() as session:
+                result = session.exec(delete(model).where(model.id.in_(batch)))
+                session.commit()
+            total += result.rowcount or 0
+            if (result.rowcount or 0) < batch_size:
+                break
+        deleted[model.__name__] = total
+    return deleted
+
+
 # --------------------- Main ---------------------
 
 def mask_db_url(url: str) -> str:
@@ -110,11 +157,13 @@ def mask_db_url(url: str) -> str:
 
 
 def main() -> None:
-    p = argparse.ArgumentParser(description="Run maintenance cleanup tasks: delete stale unverified users and purge past availability slots.")
+    p = argparse.ArgumentParser(description="Run maintenance cleanup tasks: delete stale unverified users, purge past availability slots and meetups, and reap expired auth tokens.")
     p.add_argument("--users-hours", type=int, default=24, help="Delete users unverified older than this many hours (default: 24)")
     p.add_argument("--slots-grace-hours", type=int, default=0, help="Grace period before deleting past slots (default: 0)")
     p.add_argument("--dry-run", action="store_true", help="Only report what would be deleted")
     p.add_argument("--meetups-grace-hours", type=int, default=0, help="Grace period before deleting past meetups (default: 0)")
+    p.add_argument("--tokens-grace-hours", type=int, default=24, help="Keep expired/revoked auth tokens this long before deleting (default: 24)")
+    p.add_argument("--tokens-batch-size", type=int, default=5000, help="Rows per delete statement when reaping tokens (default: 5000)")
     args = p.parse_args()
 
     try:
@@ -143,6 +192,11 @@ def main() -> None:
     if meetup_ids:
         print("[Meetups] IDs:", ", ".join(map(str, meetup_ids[:50])) + (" ..." if len(meetup_ids) > 50 else ""))
 
+    # Auth tokens
+    token_counts = count_stale_tokens(args.tokens_grace_hours)
+    for name, count in token_counts.items():
+        print(f"[Tokens] Found {count} stale {name} row(s) with grace {args.tokens_grace_hours}h")
+
     if args.dry_run:
         print("Dry-run: no changes applied.")
         return
@@ -153,6 +207,9 @@ def main() -> None:
     print(f"Deleted users: {deleted_users}")
     print(f"Deleted slots: {deleted_slots}")
     print(f"Deleted meetups: {deleted_meetups}")
+    if any(token_counts.values()):
+        for name, count in delete_stale_tokens(args.tokens_grace_hours, args.tokens_batch_size).items():
+            print(f"Deleted {name}: {count}")
 
 
 if __name__ == "__main__":
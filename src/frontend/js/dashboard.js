@@ -1329,7 +1329,15 @@
         try {
           // Ensure a match exists, then annotate
           const mc = await api('/api/match/create', { method: 'POST', auth: true, body: { a_user_id: currentUserId, b_user_id: candId } });
-          await api('/api/match/annotate', { method: 'POST', auth: true, body: { match_id: mc.match_id, lang: targetLang } });
+          // Generation runs as a background job; poll until it finishes
+          let job = await api('/api/match/annotate', { method: 'POST', auth: true, body: { match_id: mc.match_id, lang: targetLang, pair: true } });
+          const deadline = Date.now() + 180000;
+          while (job && (job.status === 'queued' || job.status === 'running')) {
+            if (Date.now() > deadline) throw new Error('AI comment is taking longer than expected');
+            await new Promise((resolve) => setTimeout(resolve, 1500));
+            job = await api(`/api/match/annotate/${job.job_id}`, { auth: true });
+          }
+          if (!job || job.status !== 'done') throw new Error((job && job.error) || 'Failed to generate comment');
           toast('AI comment generated');
           await fetchAndRenderMatches();
         } catch (err) {
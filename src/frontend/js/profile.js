@@ -551,7 +551,7 @@
         const lat = parseFloat(latEl?.value || '');
         const lon = parseFloat(lonEl?.value || '');
         if (!Number.isNaN(lat) && !Number.isNaN(lon)) {
-          const resp = await api('/api/timezone', { method: 'POST', body: { lat, lon } });
+          const resp = await api('/api/timezone', { method: 'POST', body: { lat, lon, place_name: item.display_name || null } });
           const tz = resp && (resp.time_zone || resp.timezone || resp.tz);
           if (tz) {
             if (tzSel) tzSel.value = tz;
@@ -647,7 +647,7 @@
         const lat = parseFloat(latEl?.value || '');
         const lon = parseFloat(lonEl?.value || '');
         if (!Number.isNaN(lat) && !Number.isNaN(lon)) {
-          const resp = await api('/api/timezone', { method: 'POST', body: { lat, lon } });
+          const resp = await api('/api/timezone', { method: 'POST', body: { lat, lon, place_name: item.display_name || null } });
           const tz = resp && (resp.time_zone || resp.timezone || resp.tz);
           if (tz) {
             if (tzEl) tzEl.value = tz;
@@ -1156,6 +1156,12 @@
       if (!langPref) langPref = (window.SimpleI18n && window.SimpleI18n.currentLang) || null;
       const body = { message: message || null, history: aiHistory };
       if (langPref) body.lang = langPref;
+      // Prefer the streaming endpoint so text shows up as it is generated
+      try {
+        if (await streamInterpret(body)) return;
+      } catch (err) {
+        show('profile.interpret.stream:ERROR', err);
+      }
       const resp = await api('/api/profile/interpret', { method: 'POST', body, auth: true });
       const reply = resp && resp.reply ? String(resp.reply) : '';
       if (reply) {
@@ -1164,6 +1170,62 @@
       }
     }
 
+    // Returns true when a reply was streamed; false lets the caller fall back to the JSON endpoint
+    async function streamInterpret(body) {
+      if (typeof ReadableStream === 'undefined' || typeof TextDecoder === 'undefined') return false;
+      const res = await fetch('/api/profile/interpret/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${token()}` },
+        body: JSON.stringify(body),
+      });
+      if (!res.ok || !res.body) return false;
+      const entry = { role: 'assistant', content: '' };
+      aiHistory.push(entry);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let received = false;
+      try {
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let sep;
+          while ((sep = buffer.indexOf('\n\n')) >= 0) {
+            const raw = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = 'message';
+            let data = '';
+            raw.split('\n').forEach((line) => {
+              if (line.startsWith('event:')) event = line.slice(6).trim();
+              else if (line.startsWith('data:')) data += line.slice(5).trim();
+            });
+            if (!data) continue;
+            const payload = JSON.parse(data);
+            if (event === 'error') throw new Error(payload.detail || 'Interpretation failed');
+            if (event === 'done') entry.content = String(payload.reply || entry.content);
+            else if (payload.delta) {
+              entry.content += payload.delta;
+              received = true;
+            }
+            renderAiMessages();
+          }
+        }
+      } catch (err) {
+        if (received) {
+          // The model already produced text; keep it instead of paying for a second full generation
+          show('profile.interpret.stream:ERROR', err);
+          return true;
+        }
+        // Nothing arrived yet: drop the empty reply; the caller retries without streaming
+        aiHistory.splice(aiHistory.indexOf(entry), 1);
+        renderAiMessages();
+        throw err;
+      }
+      if (!entry.content) aiHistory.pop();
+      return true;
+    }
+
     bindClick('btn-interpret-initial', async () => {
       try {
         // Reset history and ask for initial reading